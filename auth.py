@@ -0,0 +1,77 @@
+import os
+import hmac
+import base64
+import hashlib
+
+# password hashing — salted scrypt, PBKDF2 when this Python's OpenSSL has no scrypt
+# stored formats:
+#   scrypt$<n>$<r>$<p>$<salt>$<hash>
+#   pbkdf2_sha256$<iterations>$<salt>$<hash>
+# anything else is a legacy plaintext row; it still logs in once and is re-hashed on that login
+
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+PBKDF2_ITERATIONS = 600_000
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+HAS_SCRYPT = hasattr(hashlib, "scrypt")
+
+
+def _b64(raw):
+    return base64.b64encode(raw).decode("ascii")
+
+
+def _unb64(text):
+    return base64.b64decode(text.encode("ascii"))
+
+
+def _scrypt(password, salt, n, r, p):
+    # maxmem needs to cover 128 * n * r bytes, hashlib's default (32 MB) is too small for n >= 2**15
+    return hashlib.scrypt(password.encode(), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p + (1 << 20), dklen=HASH_BYTES)
+
+
+def _pbkdf2(password, salt, iterations):
+    return hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations, dklen=HASH_BYTES)
+
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P, iterations=PBKDF2_ITERATIONS):
+    salt = os.urandom(SALT_BYTES)
+    if HAS_SCRYPT:
+        return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+    return f"pbkdf2_sha256${iterations}${_b64(salt)}${_b64(_pbkdf2(password, salt, iterations))}"
+
+
+def verify_password(password, stored):
+    parts = stored.split("$")
+    try:
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            return hmac.compare_digest(_scrypt(password, _unb64(parts[4]), n, r, p), _unb64(parts[5]))
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            return hmac.compare_digest(_pbkdf2(password, _unb64(parts[2]), int(parts[1])), _unb64(parts[3]))
+    except ValueError:
+        return False
+    # legacy plaintext row
+    return hmac.compare_digest(password.encode(), stored.encode())
+
+
+def needs_rehash(stored):
+    # legacy rows and hashes made with older cost settings get upgraded on next login
+    parts = stored.split("$")
+    if HAS_SCRYPT:
+        return parts[:4] != ["scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+    return parts[:2] != ["pbkdf2_sha256", str(PBKDF2_ITERATIONS)]
+
+
+# verify_user calls this for unknown emails so they take as long as a wrong password
+_DUMMY_HASH = None
+
+
+def burn_time(password):
+    global _DUMMY_HASH
+    if _DUMMY_HASH is None:
+        _DUMMY_HASH = hash_password("takebook")
+    verify_password(password, _DUMMY_HASH)
@@ -0,0 +1,160 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import cv2
+
+import filters
+from camera import ArraySource, VideoFileSource, make_synthetic_frames
+from mood import MoodDetector, draw as draw_mood
+
+# deterministic CV benchmark: replays a fixed clip through each pipeline and reports
+# p50/p95 frame latency, fps and peak traced memory, compared against saved baselines.
+# usage:
+#   python benchmarks/bench_cv.py                 # synthetic 640x480 clip
+#   python benchmarks/bench_cv.py --clip face.mp4 # recorded clip (needed for real face/hand numbers)
+#   python benchmarks/bench_cv.py --save          # store current numbers as the baseline
+
+BASELINE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines.json")
+TOLERANCE = 0.15   # >15% worse p95 or fps counts as a regression
+
+
+def filter_pipeline(spec):
+    chain = filters.build(spec)
+
+    def run(frame):
+        # same work as VideoFilterWindow.process_frame
+        return cv2.cvtColor(chain.run(cv2.flip(frame, 1)), cv2.COLOR_BGR2RGB)
+    return run
+
+
+def mood_pipeline(fast):
+    detector = MoodDetector(fast=fast)
+
+    def run(frame):
+        frame = cv2.flip(frame, 1)
+        faces, smiles, mood = detector.process(frame)
+        draw_mood(frame, faces, smiles, mood)
+        return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+    return run
+
+
+def snake_pipeline():
+    # inference stage of play_hand_snake; skipped when mediapipe is not installed
+    from hands import HandTracker
+    tracker = HandTracker().load()
+
+    def run(frame):
+        frame = cv2.flip(frame, 1)
+        return tracker.process(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB))
+    run.close = tracker.close
+    return run
+
+
+PIPELINES = {
+    "filter:Sepia": lambda: filter_pipeline("Sepia"),
+    "filter:Vintage": lambda: filter_pipeline("Vintage"),
+    "filter:Cartoon": lambda: filter_pipeline("Cartoon"),
+    "mood:fast": lambda: mood_pipeline(True),
+    "mood:full": lambda: mood_pipeline(False),
+    "snake:inference": snake_pipeline,
+}
+
+
+def measure(make, frames, warmup=5):
+    run = make()
+    source = ArraySource(frames)
+    for frame in frames[:warmup]:
+        run(frame)
+    latencies = []
+    tracemalloc.start()
+    started = time.perf_counter()
+    while True:
+        ok, frame = source.read()
+        if not ok:
+            break
+        t0 = time.perf_counter()
+        run(frame)
+        latencies.append((time.perf_counter() - t0) * 1000)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    if hasattr(run, "close"):
+        run.close()
+    return {"p50_ms": round(float(np.percentile(latencies, 50)), 3),
+            "p95_ms": round(float(np.percentile(latencies, 95)), 3),
+            "fps": round(len(latencies) / elapsed, 1),
+            "peak_kb": round(peak / 1024, 1)}
+
+
+def load_clip(path, limit):
+    src = VideoFileSource(path)
+    frames = []
+    while len(frames) < limit:
+        ok, frame = src.read()
+        if not ok:
+            break
+        frames.append(frame)
+    src.release()
+    return frames
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--clip", help="video file to replay (default: synthetic pattern)")
+    parser.add_argument("--frames", type=int, default=120)
+    parser.add_argument("--only", nargs="*", help="pipeline names to run")
+    parser.add_argument("--save", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args()
+
+    frames = load_clip(args.clip, args.frames) if args.clip else make_synthetic_frames(640, 480, args.frames)
+    if not frames:
+        sys.exit(f"no frames read from {args.clip}")
+    clip = os.path.basename(args.clip) if args.clip else "synthetic"
+
+    baselines = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baselines = json.load(f)
+    base = baselines.get(clip, {})
+
+    results, regressions = {}, []
+    print(f"clip: {clip} ({len(frames)} frames, {frames[0].shape[1]}x{frames[0].shape[0]})")
+    print(f"{'pipeline':<18}{'p50 ms':>9}{'p95 ms':>9}{'fps':>8}{'peak KB':>10}  vs baseline")
+    for name, make in PIPELINES.items():
+        if args.only and name not in args.only:
+            continue
+        try:
+            r = measure(make, frames)
+        except ImportError as e:
+            print(f"{name:<18}skipped ({e})")
+            continue
+        results[name] = r
+        note = ""
+        old = base.get(name)
+        if old:
+            worse_p95 = r["p95_ms"] > old["p95_ms"] * (1 + TOLERANCE)
+            worse_fps = r["fps"] < old["fps"] * (1 - TOLERANCE)
+            note = f"p95 {r['p95_ms'] / old['p95_ms'] - 1:+.0%}, fps {r['fps'] / old['fps'] - 1:+.0%}"
+            if worse_p95 or worse_fps:
+                note += "  REGRESSION"
+                regressions.append(name)
+        print(f"{name:<18}{r['p50_ms']:>9.2f}{r['p95_ms']:>9.2f}{r['fps']:>8.1f}{r['peak_kb']:>10.1f}  {note}")
+
+    if args.save:
+        baselines[clip] = {**base, **results}
+        with open(BASELINE_FILE, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"baseline saved to {BASELINE_FILE}")
+    if regressions:
+        sys.exit(f"regressions: {', '.join(regressions)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import cv2
+from PIL import Image, ImageTk
+
+from camera import make_synthetic_frames
+from display import DisplaySurface, _HAS_STATS
+
+# display path benchmark: per-frame time and PIL images created per frame (each one is a
+# full-frame pixel buffer; Pillow mallocs those, so tracemalloc cannot see them) for
+#   legacy  — cvtColor to RGB + Image.fromarray + a new PhotoImage every frame
+#   surface — DisplaySurface.write + refresh (block images pasted into one PhotoImage)
+# needs a display for the real PhotoImage paste; headless it times write() only and checks that
+# the buffers meet ImageTk's no-convert condition (block image, same mode as the photo).
+# usage: python benchmarks/bench_display.py [--frames 300] [--size 640x480]
+
+
+def pil_images():
+    return Image.core.get_stats()["new_count"]
+
+
+class _Label:
+    def config(self, **kw):
+        pass
+
+
+def measure(step, frames):
+    step(frames[0])   # first frame allocates buffers / the photo
+    images = pil_images()
+    start = time.perf_counter()
+    for frame in frames:
+        step(frame)
+    elapsed = time.perf_counter() - start
+    n = len(frames)
+    return elapsed / n * 1000, (pil_images() - images) / n
+
+
+def main(args):
+    w, h = args.size
+    frames = make_synthetic_frames(w, h, args.frames)
+    try:
+        root = __import__("tkinter").Tk()
+        root.withdraw()
+    except Exception as e:
+        root = None
+        print(f"no display ({e.__class__.__name__}): timing write() only")
+
+    surface = DisplaySurface(_Label())
+    if root is not None:
+        def legacy(frame):
+            rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            ImageTk.PhotoImage(Image.fromarray(rgb))
+
+        def current(frame):
+            surface.write(frame)
+            surface.refresh()
+    else:
+        def legacy(frame):
+            Image.fromarray(cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)).convert("RGBA")
+
+        current = surface.write
+
+    if not _HAS_STATS:
+        print("this Pillow has no Image.core.get_stats: PIL image counts read 0")
+    print(f"{'path':<10}{'ms/frame':>10}{'PIL images/frame':>18}")
+    for name, step in (("legacy", legacy), ("surface", current)):
+        ms, per_frame = measure(step, frames)
+        print(f"{name:<10}{ms:>10.3f}{per_frame:>18.2f}")
+    blittable = all(getattr(im.im, "isblock", lambda: False)() and im.mode == "RGBA" for im in surface.images)
+    print("surface buffers pasteable without conversion:", blittable)
+    print("surface stats:", surface.stats())
+    if root is not None:
+        root.destroy()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--size", default=(640, 480), type=lambda s: tuple(int(x) for x in s.split("x")))
+    main(parser.parse_args())
@@ -0,0 +1,60 @@
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import auth
+import db_simple
+
+# login latency at each password-hash cost setting
+# usage: python benchmarks/bench_login.py [--rounds 5]
+
+SCRYPT_COSTS = [2 ** 12, 2 ** 13, 2 ** 14, 2 ** 15, 2 ** 16]
+PBKDF2_COSTS = [100_000, 300_000, 600_000, 1_000_000]
+
+
+def timed(func, rounds):
+    samples = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def bench_hashes(rounds):
+    print(f"{'scheme':<16}{'cost':>10}{'verify ms (p50)':>18}{'max ms':>10}")
+    if auth.HAS_SCRYPT:
+        for n in SCRYPT_COSTS:
+            stored = auth.hash_password("secret", n=n)
+            p50, worst = timed(lambda: auth.verify_password("secret", stored), rounds)
+            print(f"{'scrypt':<16}{'n=%d' % n:>10}{p50:>18.1f}{worst:>10.1f}")
+    for it in PBKDF2_COSTS:
+        salt = os.urandom(auth.SALT_BYTES)
+        p50, worst = timed(lambda: auth._pbkdf2("secret", salt, it), rounds)
+        print(f"{'pbkdf2_sha256':<16}{it:>10}{p50:>18.1f}{worst:>10.1f}")
+
+
+def bench_verify_user(rounds):
+    # end to end: verify_user against a scratch database with the current default cost
+    with tempfile.TemporaryDirectory() as tmp:
+        db_simple.DB_NAME = os.path.join(tmp, "bench.db")
+        db_simple.create_tables()
+        db_simple.add_user("bench@takebook", "secret")
+        ok, _ = timed(lambda: db_simple.verify_user("bench@takebook", "secret"), rounds)
+        bad, _ = timed(lambda: db_simple.verify_user("bench@takebook", "wrong"), rounds)
+        unknown, _ = timed(lambda: db_simple.verify_user("nobody@takebook", "secret"), rounds)
+        db_simple.close_pool()
+    print(f"\nverify_user (default cost) p50: ok {ok:.1f} ms, wrong password {bad:.1f} ms, unknown email {unknown:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+    bench_hashes(args.rounds)
+    bench_verify_user(args.rounds)
@@ -0,0 +1,145 @@
+import os
+import sys
+import time
+import shutil
+import sqlite3
+import argparse
+import tempfile
+import statistics
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import db_simple
+from manage import synthetic_posts
+
+# database size and query time before / after the schema changes (v3 -> current): the author_id
+# rebuild (v4) and the (created_at, id) feed indexes (v5), on a synthetic database; the v3 copy is
+# migrated in place, so the migration itself is timed too.
+# usage: python benchmarks/bench_schema.py [--posts 500000] [--users 2000] [--runs 200]
+
+AUTHOR = "user7@example.com"
+PAGE = 20
+
+
+def page_query(cursor=False, author=False):
+    # current schema: exactly the SQL get_posts_page runs (cursor subquery, author subselect)
+    def build(params):
+        sql, args = db_simple._page_sql(params["cursor"] if cursor else None, AUTHOR if author else None)
+        return sql, args + [PAGE]
+    return build
+
+
+# name -> (v3 sql, current sql or page_query builder); params are filled in by run_queries
+QUERIES = {
+    "feed page 1": (
+        "SELECT id, author, content, image_path, created_at FROM posts ORDER BY id DESC LIMIT 20",
+        page_query()),
+    "feed deep page": (
+        "SELECT id, author, content, image_path, created_at FROM posts WHERE id<:cursor ORDER BY id DESC LIMIT 20",
+        page_query(cursor=True)),
+    "author page": (
+        "SELECT id, author, content, image_path, created_at FROM posts WHERE author=:author "
+        "ORDER BY id DESC LIMIT 20",
+        page_query(author=True)),
+    "author deep page": (
+        "SELECT id, author, content, image_path, created_at FROM posts WHERE author=:author AND id<:cursor "
+        "ORDER BY id DESC LIMIT 20",
+        page_query(cursor=True, author=True)),
+    "author post count": (
+        "SELECT COUNT(*) FROM posts WHERE author=:author",
+        "SELECT COUNT(*) FROM posts WHERE author_id=(SELECT id FROM authors WHERE email=:author)"),
+    "search page": (
+        "SELECT p.id, p.author, p.content FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid "
+        "WHERE posts_fts MATCH :match ORDER BY posts_fts.rank, p.id DESC LIMIT 20",
+        "SELECT p.id, a.email, p.content FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid "
+        "JOIN authors a ON a.id = p.author_id WHERE posts_fts MATCH :match "
+        "ORDER BY posts_fts.rank, p.id DESC LIMIT 20"),
+}
+
+
+def build_v3(path, posts, users):
+    # old layout: posts.author is the email string
+    db_simple.DB_NAME = path
+    db_simple.migrate(3)
+    db_simple.close_pool()
+    authors = [f"user{i}@example.com" for i in range(users)]
+    conn = sqlite3.connect(path)
+    with conn:
+        conn.executemany("INSERT INTO users (email, password) VALUES (?, 'x')", [(a,) for a in authors])
+        conn.executemany("INSERT INTO posts (author, content, image_path, created_at) VALUES (?, ?, ?, ?)",
+                         synthetic_posts(posts, authors))
+    conn.execute("VACUUM")
+    conn.close()
+
+
+def sizes(path):
+    conn = sqlite3.connect(path)
+    total = os.path.getsize(path)
+    try:
+        # per table / index, when SQLite was built with the dbstat table
+        parts = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+    except sqlite3.OperationalError:
+        parts = {}
+    conn.close()
+    return total, parts
+
+
+def run_queries(path, version, runs, posts):
+    conn = sqlite3.connect(path)
+    params = {"cursor": posts // 2, "author": AUTHOR, "match": '"chai"* "yaar"*'}
+    out = {}
+    for name, queries in QUERIES.items():
+        query = queries[0 if version == 3 else 1]
+        sql, args = (query, params) if isinstance(query, str) else query(params)
+        conn.execute(sql, args).fetchall()   # warm the page cache
+        samples = []
+        for _ in range(runs):
+            start = time.perf_counter()
+            conn.execute(sql, args).fetchall()
+            samples.append((time.perf_counter() - start) * 1000)
+        out[name] = statistics.median(samples)
+    conn.close()
+    return out
+
+
+def mb(n):
+    return f"{n / 1048576:.1f} MB"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--posts", type=int, default=500000)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    before, after = os.path.join(tmp, "v3.db"), os.path.join(tmp, f"v{db_simple.SCHEMA_VERSION}.db")
+    print(f"building v3 database: {args.posts} posts, {args.users} authors ...")
+    build_v3(before, args.posts, args.users)
+    shutil.copy(before, after)
+
+    db_simple.DB_NAME = after
+    start = time.perf_counter()
+    db_simple.migrate()
+    migrate_s = time.perf_counter() - start
+    db_simple.close_pool()
+    conn = sqlite3.connect(after)
+    conn.execute("VACUUM")
+    conn.close()
+    print(f"migration v3 -> v{db_simple.SCHEMA_VERSION}: {migrate_s:.1f}s\n")
+
+    (size3, parts3), (size4, parts4) = sizes(before), sizes(after)
+    print(f"{'size':<28}{'before':>12}{'after':>12}")
+    print(f"{'database file':<28}{mb(size3):>12}{mb(size4):>12}")
+    for name in sorted(set(parts3) | set(parts4)):
+        if name.startswith("posts_fts_") or name == "sqlite_schema":
+            continue
+        print(f"{name:<28}{mb(parts3.get(name, 0)):>12}{mb(parts4.get(name, 0)):>12}")
+
+    q3 = run_queries(before, 3, args.runs, args.posts)
+    q4 = run_queries(after, db_simple.SCHEMA_VERSION, args.runs, args.posts)
+    print(f"\n{'query (p50 ms)':<28}{'before':>12}{'after':>12}")
+    for name in QUERIES:
+        print(f"{name:<28}{q3[name]:>12.3f}{q4[name]:>12.3f}")
+    shutil.rmtree(tmp)
@@ -0,0 +1,167 @@
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import socket
+import asyncio
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import db_simple
+from auth import hash_password
+from manage import synthetic_posts, WORDS
+
+# load generator for server.py: starts the server on a synthetic database in a separate process,
+# then runs keep-alive clients at increasing concurrency and reports requests/s and tail latency.
+# each client logs in once, then loops over a mix of feed pages, searches and new posts.
+# usage: python benchmarks/bench_server.py [--levels 1,4,16,64] [--duration 5] [--posts 50000]
+
+MIX = (("feed", 0.7), ("search", 0.2), ("post", 0.1))
+PASSWORD = "password"
+
+
+def seed(path, posts, users):
+    db_simple.DB_NAME = path
+    db_simple.create_tables()
+    stored = hash_password(PASSWORD)
+    authors = [f"user{i}@example.com" for i in range(users)]
+    db_simple.add_users_many({"email": a, "password_hash": stored} for a in authors)
+    db_simple.add_posts_many(synthetic_posts(posts, authors))
+    db_simple.close_pool()
+    return authors
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+async def wait_for_port(port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            _, w = await asyncio.open_connection("127.0.0.1", port)
+            w.close()
+            return
+        except OSError:
+            await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start")
+
+
+class Client:
+    # one keep-alive HTTP/1.1 connection
+    def __init__(self, port):
+        self.port = port
+        self.token = None
+
+    async def connect(self):
+        self.reader, self.writer = await asyncio.open_connection("127.0.0.1", self.port)
+
+    async def request(self, method, path, payload=None):
+        body = json.dumps(payload).encode() if payload is not None else b""
+        head = f"{method} {path} HTTP/1.1\r\nHost: localhost\r\nContent-Length: {len(body)}\r\n"
+        if self.token:
+            head += f"Authorization: Bearer {self.token}\r\n"
+        self.writer.write(head.encode() + b"\r\n" + body)
+        await self.writer.drain()
+        status_line = await self.reader.readuntil(b"\r\n")
+        headers = await self.reader.readuntil(b"\r\n\r\n")
+        length = 0
+        for line in headers.decode("latin-1").split("\r\n"):
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        data = await self.reader.readexactly(length)
+        return int(status_line.split()[1]), data
+
+    def close(self):
+        self.writer.close()
+
+
+async def login(port, email):
+    client = Client(port)
+    await client.connect()
+    status, data = await client.request("POST", "/login", {"email": email, "password": PASSWORD})
+    if status != 200:
+        raise RuntimeError(f"login failed for {email}: {status}")
+    client.token = json.loads(data)["token"]
+    return client
+
+
+async def client_loop(client, stop_at, latencies, errors, rng, max_cursor):
+    kinds, weights = zip(*MIX)
+    while time.perf_counter() < stop_at:
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "feed":
+            # mostly the first page (cache friendly), sometimes deep in the feed
+            cursor = "" if rng.random() < 0.5 else str(rng.randint(1, max_cursor))
+            args = ("GET", f"/feed?cursor={cursor}")
+        elif kind == "search":
+            args = ("GET", f"/search?q={rng.choice(WORDS)}")
+        else:
+            args = ("POST", "/posts", {"content": " ".join(rng.choices(WORDS, k=8))})
+        start = time.perf_counter()
+        status, _ = await client.request(*args)
+        latencies.append((time.perf_counter() - start) * 1000)
+        if status >= 400:
+            errors.append(status)
+    client.close()
+
+
+def pct(sorted_ms, q):
+    return sorted_ms[min(int(q * len(sorted_ms)), len(sorted_ms) - 1)] if sorted_ms else 0.0
+
+
+async def run_level(port, authors, concurrency, duration, max_cursor):
+    # logins (deliberately slow password hashing) happen before the timed window
+    clients = await asyncio.gather(*(login(port, authors[i % len(authors)]) for i in range(concurrency)))
+    latencies, errors = [], []
+    stop_at = time.perf_counter() + duration
+    started = time.perf_counter()
+    await asyncio.gather(*(client_loop(c, stop_at, latencies, errors, random.Random(i), max_cursor)
+                           for i, c in enumerate(clients)))
+    elapsed = time.perf_counter() - started
+    latencies.sort()
+    return len(latencies) / elapsed, pct(latencies, 0.5), pct(latencies, 0.95), pct(latencies, 0.99), len(errors)
+
+
+async def main(args):
+    tmp = tempfile.mkdtemp()
+    path = os.path.join(tmp, "server.db")
+    print(f"seeding {args.posts} posts ...")
+    authors = seed(path, args.posts, args.users)
+    port = free_port()
+    server = subprocess.Popen([sys.executable, os.path.join(ROOT, "server.py"), "--db", path,
+                               "--port", str(port)], stdout=subprocess.DEVNULL)
+    try:
+        await wait_for_port(port)
+        print(f"{'clients':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+        for level in args.levels:
+            rps, p50, p95, p99, errors = await run_level(port, authors, level, args.duration, args.posts)
+            print(f"{level:>8}{rps:>10.0f}{p50:>10.2f}{p95:>10.2f}{p99:>10.2f}{errors:>8}")
+        stats_client = Client(port)
+        await stats_client.connect()
+        _, data = await stats_client.request("GET", "/stats")
+        stats_client.close()
+        stats = json.loads(data)
+        print("group commit:", stats["group_commit"])
+        print("feed cache:", stats["feed_cache"])
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", default="1,4,16,64", type=lambda s: [int(x) for x in s.split(",")])
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--posts", type=int, default=50000)
+    parser.add_argument("--users", type=int, default=200)
+    asyncio.run(main(parser.parse_args()))
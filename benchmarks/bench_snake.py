@@ -0,0 +1,84 @@
+import os
+import sys
+import math
+import time
+import argparse
+from collections import deque
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import cv2
+
+from snake import SnakeBody
+
+# per-frame cost of snake bookkeeping + collision + drawing, old deque loop vs SnakeBody
+# usage: python benchmarks/bench_snake.py [--frames 200]
+
+LENGTHS = [10, 100, 500, 1000, 2500, 5000]
+W, H = 640, 480
+
+
+def path(n, frames):
+    # fingertip wandering around the frame without crossing itself much
+    t = np.arange(n + frames)
+    xs = (W / 2 + (W / 2 - 40) * np.sin(t / 97.0) * np.cos(t / 31.0)).astype(int)
+    ys = (H / 2 + (H / 2 - 40) * np.sin(t / 53.0)).astype(int)
+    return list(zip(xs.tolist(), ys.tolist()))
+
+
+def legacy(points, n, frames, frame):
+    # returns (collision ms, draw ms) per frame
+    snake = deque()
+    for p in points[:n]:
+        snake.append(list(p))
+    hit_t = draw_t = 0.0
+    for p in points[n:n + frames]:
+        head = list(p)
+        snake.append(head)
+        if len(snake) > n:
+            snake.popleft()
+        t0 = time.perf_counter()
+        for i in range(len(snake) - 10):
+            if math.hypot(head[0] - snake[i][0], head[1] - snake[i][1]) < 10:
+                break
+        t1 = time.perf_counter()
+        for i in range(1, len(snake)):
+            cv2.line(frame, tuple(snake[i - 1]), tuple(snake[i]), (0, 255, 0), 15)
+        t2 = time.perf_counter()
+        hit_t += t1 - t0
+        draw_t += t2 - t1
+    return hit_t * 1000 / frames, draw_t * 1000 / frames
+
+
+def vectorized(points, n, frames, frame):
+    snake = SnakeBody(max_len=n)
+    for x, y in points[:n]:
+        snake.append(x, y)
+    hit_t = draw_t = 0.0
+    for x, y in points[n:n + frames]:
+        snake.append(x, y)
+        t0 = time.perf_counter()
+        snake.hits_itself()
+        t1 = time.perf_counter()
+        snake.draw(frame)
+        t2 = time.perf_counter()
+        hit_t += t1 - t0
+        draw_t += t2 - t1
+    return hit_t * 1000 / frames, draw_t * 1000 / frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=200)
+    args = parser.parse_args()
+
+    frame = np.zeros((H, W, 3), np.uint8)
+    print("ms/frame      ---- collision ----        ------ draw ------")
+    print(f"{'length':>8}{'deque':>10}{'SnakeBody':>11}{'speedup':>9}{'lines':>10}{'polylines':>11}{'speedup':>9}")
+    for n in LENGTHS:
+        pts = path(n, args.frames)
+        old_hit, old_draw = legacy(pts, n, args.frames, frame)
+        new_hit, new_draw = vectorized(pts, n, args.frames, frame)
+        print(f"{n:>8}{old_hit:>10.3f}{new_hit:>11.3f}{old_hit / new_hit:>8.1f}x"
+              f"{old_draw:>10.3f}{new_draw:>11.3f}{old_draw / new_draw:>8.1f}x")
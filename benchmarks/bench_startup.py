@@ -0,0 +1,64 @@
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+
+# cold-start cost of the app, each sample in a fresh interpreter:
+#   import ui           — what main.py pays before the login window can exist
+#   import ui + cv      — the old behaviour, when ui imported the CV stack at module level
+#   first window        — imports + create_tables + Tk() + FacebookLogin drawn once (needs a display)
+# usage: python benchmarks/bench_startup.py [--runs 5]
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_UI = "import ui"
+IMPORT_ALL = "import ui, cv, hands; hands.mediapipe_solutions()"
+FIRST_WINDOW = """
+import tempfile, db_simple
+db_simple.DB_NAME = os.path.join(tempfile.mkdtemp(), "startup.db")
+db_simple.create_tables()
+import tkinter as tk
+from ui import FacebookLogin
+root = tk.Tk()
+FacebookLogin(root)
+root.update()
+"""
+
+CASES = [("import ui", IMPORT_UI), ("import ui + cv", IMPORT_ALL), ("first window", FIRST_WINDOW)]
+
+TEMPLATE = """
+import os, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+{body}
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def sample(body):
+    script = TEMPLATE.format(root=ROOT, body=body)
+    proc = subprocess.run([sys.executable, "-c", script], cwd=ROOT, capture_output=True, text=True)
+    if proc.returncode != 0:
+        return None, proc.stderr.strip().splitlines()[-1] if proc.stderr else "failed"
+    return float(proc.stdout.strip().splitlines()[-1]), None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<18}{'p50 ms':>10}{'min ms':>10}{'max ms':>10}")
+    for label, body in CASES:
+        sample(body)   # first run warms the OS file cache and writes .pyc files
+        times, error = [], None
+        for _ in range(args.runs):
+            ms, error = sample(body)
+            if ms is None:
+                break
+            times.append(ms)
+        if not times:
+            print(f"{label:<18}  skipped: {error}")
+            continue
+        print(f"{label:<18}{statistics.median(times):>10.1f}{min(times):>10.1f}{max(times):>10.1f}")
@@ -0,0 +1,251 @@
+import time
+import threading
+import numpy as np
+import cv2
+
+# frame sources. everything here has the VideoCapture-style isOpened() / read() / release() API,
+# so the camera windows, the snake game and the benchmarks can take any of them:
+#   open_camera(0)            live camera through the shared broker
+#   VideoFileSource(path)     recorded clip
+#   SyntheticSource(w, h, n)  generated frames, no files or devices needed
+#   ArraySource(frames)       replay of frames already in memory
+#
+# live camera: one capture thread per device, shared by every window / game that wants frames.
+# frames land in a ring of preallocated buffers and subscribers get read-only views (no copy),
+# so a subscriber must finish with (or copy) a frame within RING_SIZE - 1 frame periods.
+
+RING_SIZE = 6
+DEFAULT_WIDTH, DEFAULT_HEIGHT = 640, 480
+READ_TIMEOUT = 2.0
+
+
+class CameraBroker:
+    def __init__(self, index, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+        self.index = index
+        self.width = width
+        self.height = height
+        self.refs = 0
+        self.cap = None
+        self.ring = []
+        self.seq = 0             # frames published so far; latest frame is ring[(seq - 1) % RING_SIZE]
+        self.running = False
+        self.thread = None
+        self.cond = threading.Condition()
+
+    def start(self):
+        cap = cv2.VideoCapture(self.index)
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.height)
+        ok, first = cap.read() if cap.isOpened() else (False, None)
+        if not ok:
+            cap.release()
+            return False
+        self.cap = cap
+        self.ring = [np.empty_like(first) for _ in range(RING_SIZE)]
+        self.ring[self.seq % RING_SIZE] = first
+        self.seq += 1   # stays monotonic across restarts, so existing subscribers keep working
+        self.running = True
+        self.thread = threading.Thread(target=self._loop, daemon=True, name=f"camera-{self.index}")
+        self.thread.start()
+        return True
+
+    def _loop(self):
+        while self.running:
+            i = self.seq % RING_SIZE
+            # decode straight into the oldest ring slot
+            ok, frame = self.cap.read(self.ring[i])
+            if not ok:
+                break
+            if frame is not self.ring[i]:
+                self.ring[i] = frame   # driver changed resolution; slot replaced once
+            with self.cond:
+                self.seq += 1
+                self.cond.notify_all()
+        with self.cond:
+            self.running = False
+            self.cond.notify_all()
+
+    def latest(self, after_seq, timeout):
+        # newest (seq, frame) published after after_seq; (after_seq, None) on timeout or stop
+        with self.cond:
+            self.cond.wait_for(lambda: self.seq > after_seq or not self.running, timeout)
+            if self.seq <= after_seq:
+                return after_seq, None
+            frame = self.ring[(self.seq - 1) % RING_SIZE].view()
+        frame.flags.writeable = False
+        return self.seq, frame
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join(timeout=1.0)
+            self.thread = None
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class CameraSubscription:
+    # VideoCapture-like handle (isOpened / read / release) on a shared CameraBroker
+    def __init__(self, broker):
+        self.broker = broker
+        self.last_seq = 0
+        self.released = False
+
+    def isOpened(self):
+        return not self.released and self.broker.running
+
+    def read(self, timeout=READ_TIMEOUT):
+        # waits for a frame newer than the last one this subscriber saw; timeout=0 never blocks
+        if self.released:
+            return False, None
+        seq, frame = self.broker.latest(self.last_seq, timeout)
+        if frame is None:
+            return False, None
+        self.last_seq = seq
+        return True, frame
+
+    def release(self):
+        if not self.released:
+            self.released = True
+            _release(self.broker)
+
+
+_brokers = {}
+_lock = threading.Lock()
+
+
+def open_camera(index=0, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    # first subscriber opens the device; later ones share it (and its resolution) instantly
+    with _lock:
+        broker = _brokers.get(index)
+        if broker is not None and not broker.running:
+            # capture thread died (camera unplugged etc.) — try the device again
+            broker.stop()
+            ok = broker.start()
+        elif broker is None:
+            broker = CameraBroker(index, width, height)
+            ok = broker.start()
+            if ok:
+                _brokers[index] = broker
+        else:
+            ok = True
+        if not ok:
+            # isOpened() is False and release() is a no-op for this handle
+            sub = CameraSubscription(broker)
+            sub.released = True
+            return sub
+        broker.refs += 1
+        return CameraSubscription(broker)
+
+
+def _release(broker):
+    # last subscriber gone — stop the thread and free the device
+    with _lock:
+        broker.refs -= 1
+        if broker.refs > 0:
+            return
+        if _brokers.get(broker.index) is broker:
+            del _brokers[broker.index]
+        broker.stop()
+
+
+class _Paced:
+    # optional real-time pacing for replay sources (fps=None: as fast as the consumer reads)
+    def __init__(self, fps):
+        self.fps = fps
+        self._next = None
+
+    def wait(self):
+        if not self.fps:
+            return
+        now = time.perf_counter()
+        if self._next is not None and now < self._next:
+            time.sleep(self._next - now)
+        self._next = max(now, self._next or now) + 1.0 / self.fps
+
+
+class VideoFileSource:
+    def __init__(self, path, loop=False, fps=None):
+        self.path = path
+        self.loop = loop
+        self.cap = cv2.VideoCapture(path)
+        self.pacer = _Paced(fps)
+        self.exhausted = False   # end of file (or unreadable) without loop: every read() would fail
+
+    def isOpened(self):
+        return not self.exhausted and self.cap is not None and self.cap.isOpened()
+
+    def read(self, timeout=None):
+        if not self.isOpened():
+            return False, None
+        self.pacer.wait()
+        ok, frame = self.cap.read()
+        if not ok and self.loop:
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            ok, frame = self.cap.read()
+        if not ok:
+            self.exhausted = True
+        return ok, frame
+
+    def release(self):
+        if self.cap is not None:
+            self.cap.release()
+            self.cap = None
+
+
+class ArraySource:
+    # replays a list of frames; each read() returns the stored array itself (treat as read-only)
+    def __init__(self, frames, loop=False, fps=None):
+        self.frames = list(frames)
+        self.loop = loop
+        self.pos = 0
+        self.open = True
+        self.pacer = _Paced(fps)
+
+    def isOpened(self):
+        return self.open and (self.loop or self.pos < len(self.frames))
+
+    def read(self, timeout=None):
+        if not self.open or not self.frames:
+            return False, None
+        if self.pos >= len(self.frames):
+            if not self.loop:
+                return False, None
+            self.pos = 0
+        self.pacer.wait()
+        frame = self.frames[self.pos]
+        self.pos += 1
+        return True, frame
+
+    def release(self):
+        self.open = False
+
+
+class SyntheticSource(ArraySource):
+    # deterministic test pattern: gradient background, noise and a moving bright blob
+    def __init__(self, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT, count=120, seed=0, loop=False, fps=None):
+        super().__init__(make_synthetic_frames(width, height, count, seed), loop, fps)
+
+
+def make_synthetic_frames(width, height, count, seed=0):
+    rng = np.random.default_rng(seed)
+    ramp = np.linspace(0, 200, width, dtype=np.float32)[None, :, None]
+    base = np.broadcast_to(ramp, (height, width, 3)).astype(np.uint8)
+    frames = []
+    for i in range(count):
+        frame = cv2.add(base, rng.integers(0, 40, (height, width, 3), dtype=np.uint8))
+        cx = int((0.5 + 0.4 * np.sin(i / 15)) * width)
+        cy = int((0.5 + 0.3 * np.cos(i / 11)) * height)
+        cv2.circle(frame, (cx, cy), max(width // 16, 8), (40, 200, 255), -1)
+        frames.append(frame)
+    return frames
+
+
+def open_source(spec, width=DEFAULT_WIDTH, height=DEFAULT_HEIGHT):
+    # int -> live camera index, "synthetic" -> test pattern, anything else -> video file path
+    if isinstance(spec, int) or (isinstance(spec, str) and spec.isdigit()):
+        return open_camera(int(spec), width, height)
+    if spec == "synthetic":
+        return SyntheticSource(width, height, loop=True, fps=30)
+    return VideoFileSource(spec)
@@ -1,17 +1,27 @@
 import cv2
-import mediapipe as mp
 import numpy as np
 import random
 import math
-from collections import deque
+import time
 from tkinter import Toplevel, Label, Button, ttk, messagebox
-from PIL import Image, ImageTk
-
-mp_hands = mp.solutions.hands
-mp_draw = mp.solutions.drawing_utils
-def play_hand_snake():
-    snake = deque()
-    snake_len = 10
+from pipeline import FramePipeline, FrameWorker
+from camera import open_camera
+import filters
+from mood import MoodDetector, draw as draw_mood
+from snake import SnakeBody
+from display import DisplaySurface
+from instrument import timed
+import hands
+
+def warm_up():
+    # called from a background thread after login; safe to call more than once
+    hands.get_tracker().load()   # mediapipe import + hand model, the slow part of the first game
+    MoodDetector(fast=True)   # loads the Haar cascades once so the OS file cache is warm
+
+
+def play_hand_snake(show_stats=True, source=None, tracker=None):
+    # body lives in a preallocated numpy buffer (snake.py): vectorised collision, one polylines draw
+    snake = SnakeBody(max_len=10)
     food = None
     score = 0
 
@@ -21,139 +31,161 @@ def play_hand_snake():
     def dist(a, b):
         return math.hypot(a[0] - b[0], a[1] - b[1])
 
-    cap = cv2.VideoCapture(0)
     width, height = 640, 480
-    cap.set(3, width)
-    cap.set(4, height)
-
-    hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+    # shared camera — koi aur window already camera use kar rahi ho toh bhi chalega
+    # (or any camera.py frame source: recorded clip, synthetic, in-memory replay)
+    cap = source if source is not None else open_camera(0, width, height)
+    if not cap.isOpened():
+        # runs on a worker thread — the caller (ui.py) records it and shows the message
+        raise RuntimeError("Could not open camera!")
+
+    # long-lived hand tracking engine (hands.py), shared by every round; only its state is reset
+    tracker = tracker if tracker is not None else hands.get_tracker()
+    tracker.reset()
     food = new_food(width, height)
 
-    while True:
-        success, frame = cap.read()
-        if not success:
-            break
-
+    def infer(frame):
+        # inference stage (own thread): flip + mediapipe
         frame = cv2.flip(frame, 1)
         rgb = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        result = hands.process(rgb)
-
-        if result.multi_hand_landmarks:
-            for hand_landmarks in result.multi_hand_landmarks:
-                x = int(hand_landmarks.landmark[8].x * width)
-                y = int(hand_landmarks.landmark[8].y * height)
-                head = [x, y]
-
-                snake.append(head)
-                if len(snake) > snake_len:
-                    snake.popleft()
-
-                if dist(head, food) < 25:
-                    score += 1
-                    snake_len += 5
-                    food = new_food(width, height)
-
-                for i in range(1, len(snake)):
-                    cv2.line(frame, tuple(snake[i - 1]), tuple(snake[i]), (0, 255, 0), 15)
-                cv2.circle(frame, tuple(head), 10, (0, 0, 255), -1)
-                cv2.circle(frame, tuple(food), 10, (255, 0, 0), -1)
-                cv2.putText(frame, f"Score: {score}", (10, 40),
-                            cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
-
-                if len(snake) > 10:
-                    for i in range(len(snake) - 10):
-                        if dist(head, snake[i]) < 10:
-                            cv2.putText(frame, "GAME OVER", (180, 250),
-                                        cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 3)
-                            cv2.imshow("Snake Game", frame)
-                            cv2.waitKey(1500)
-                            cap.release()
-                            cv2.destroyAllWindows()
-                            return
-
-                mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-
-        cv2.imshow("Snake Game", frame)
-        if cv2.waitKey(1) & 0xFF == 27:
-            break
-
-    cap.release()
-    cv2.destroyAllWindows()
+        return frame, tracker.process(rgb)
+
+    # capture thread keeps only the newest frame, so camera latency and inference overlap
+    pipe = FramePipeline(cap.read, infer).start()
+    try:
+        for frame, result in pipe.results():
+            start = time.perf_counter()
+            height, width = frame.shape[:2]   # replay sources may not be 640x480
+            if result.multi_hand_landmarks:
+                for hand_landmarks in result.multi_hand_landmarks:
+                    x = int(hand_landmarks.landmark[8].x * width)
+                    y = int(hand_landmarks.landmark[8].y * height)
+                    head = [x, y]
+
+                    snake.append(x, y)
+
+                    if dist(head, food) < 25:
+                        score += 1
+                        snake.grow(5)
+                        food = new_food(width, height)
+
+                    snake.draw(frame)
+                    cv2.circle(frame, tuple(head), 10, (0, 0, 255), -1)
+                    cv2.circle(frame, tuple(food), 10, (255, 0, 0), -1)
+                    cv2.putText(frame, f"Score: {score}", (10, 40),
+                                cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+
+                    if snake.hits_itself():
+                        cv2.putText(frame, "GAME OVER", (180, 250),
+                                    cv2.FONT_HERSHEY_SIMPLEX, 2, (0, 0, 255), 3)
+                        cv2.imshow("Snake Game", frame)
+                        cv2.waitKey(1500)
+                        return
+
+                    tracker.draw(frame, hand_landmarks)
+
+            if show_stats:
+                cv2.putText(frame, pipe.stats.summary(), (10, height - 15),
+                            cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+            cv2.imshow("Snake Game", frame)
+            pipe.stats.record("render", (time.perf_counter() - start) * 1000)
+            pipe.stats.tick()
+            if cv2.waitKey(1) & 0xFF == 27:
+                break
+        else:
+            # results ended without Esc or game over: the clip finished, or a stage failed
+            # (MediaPipe missing on the inference thread, inference crash, camera lost mid-game)
+            clip_over = source is not None and not cap.isOpened()
+            if pipe.error and not (clip_over and pipe.error == "capture failed"):
+                raise RuntimeError(pipe.error)
+    finally:
+        pipe.stop()
+        cap.release()
+        cv2.destroyAllWindows()
 
 
 class VideoFilterWindow(Toplevel):
-    def __init__(self, parent):
+    # source: any camera.py frame source (default: shared live camera); released on close
+    def __init__(self, parent, source=None):
         super().__init__(parent)
         self.title("Live Video Filters 🎥")
         self.geometry("720x520")
         self.resizable(False, False)
 
         Label(self, text="Choose Filter:", font=("Helvetica Bold", 12)).pack(pady=10)
-        self.filter_var = ttk.Combobox(self, values=["Normal", "Grayscale", "Sepia", "Invert", "Blur", "Cartoon"], state="readonly")
+        self.filter_var = ttk.Combobox(self, values=filters.filter_names(), state="readonly")
         self.filter_var.current(0)
         self.filter_var.pack(pady=5)
+        # worker thread reads this plain attribute — Tk variables are not safe off the Tk thread
+        self.filter_name = self.filter_var.get()
+        self.chains = {}
+        self.flipped = None
+        self.filter_var.bind("<<ComboboxSelected>>", lambda e: setattr(self, "filter_name", self.filter_var.get()))
 
         self.video_label = Label(self, bg="black")
         self.video_label.pack(padx=10, pady=10, fill="both", expand=True)
+        # one persistent PhotoImage, frames converted into reused buffers (display.py)
+        self.surface = DisplaySurface(self.video_label)
 
         Button(self, text="Close", bg="#e74c3c", fg="white", command=self.close_camera).pack(pady=10)
 
-        self.cap = cv2.VideoCapture(0)
+        self.cap = source if source is not None else open_camera(0)
+        self.protocol("WM_DELETE_WINDOW", self.close_camera)
         if not self.cap.isOpened():
             messagebox.showerror("Error", "Could not open camera!")
             self.destroy()
             return
 
+        # filter + color conversion happen on the worker; Tk only pastes the latest finished frame
+        self.worker = FrameWorker(self.cap, self.process_frame).start()
         self.running = True
         self.update_frame()
 
+    def process_frame(self, frame):
+        # runs on the worker thread
+        if self.flipped is None or self.flipped.shape != frame.shape:
+            self.flipped = np.empty_like(frame)
+        cv2.flip(frame, 1, dst=self.flipped)
+        frame = self.apply_filter(self.flipped)
+        # chain output is reused next frame, so it's converted into the surface's buffer right away
+        self.surface.write(frame)
+        return True
+
+    @timed("cv.filter")
     def apply_filter(self, frame):
-        f = self.filter_var.get()
-        if f == "Grayscale":
-            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            frame = cv2.cvtColor(frame, cv2.COLOR_GRAY2BGR)
-        elif f == "Sepia":
-            kernel = np.array([[0.272, 0.534, 0.131],
-                               [0.349, 0.686, 0.168],
-                               [0.393, 0.769, 0.189]])
-            frame = cv2.transform(frame, kernel)
-            frame = np.clip(frame, 0, 255).astype("uint8")
-        elif f == "Invert":
-            frame = cv2.bitwise_not(frame)
-        elif f == "Blur":
-            frame = cv2.GaussianBlur(frame, (15, 15), 0)
-        elif f == "Cartoon":
-            gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            gray = cv2.medianBlur(gray, 5)
-            edges = cv2.adaptiveThreshold(gray, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
-                                          cv2.THRESH_BINARY, 9, 9)
-            color = cv2.bilateralFilter(frame, 9, 250, 250)
-            frame = cv2.bitwise_and(color, color, mask=edges)
-        return frame
+        # registered filter chains (filters.py) with their own preallocated buffers, one per choice
+        chain = self.chains.get(self.filter_name)
+        if chain is None:
+            chain = self.chains[self.filter_name] = filters.build(self.filter_name)
+        return chain.run(frame)
 
     def update_frame(self):
         if not self.running:
             return
-        ret, frame = self.cap.read()
-        if ret:
-            frame = cv2.flip(frame, 1)
-            frame = self.apply_filter(frame)
-            img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            imgtk = ImageTk.PhotoImage(Image.fromarray(img))
-            self.video_label.imgtk = imgtk
-            self.video_label.config(image=imgtk)
-        self.after(10, self.update_frame)
+        done = self.worker.finished()   # checked first so the worker's last frame still gets shown
+        self.worker.latest()   # consume the slot: counts the frame as shown, not dropped
+        self.surface.refresh()
+        if done:
+            # keep the last frame up; polling a stopped worker would only spin
+            self.running = False
+            if self.worker.error:
+                messagebox.showerror("Error", self.worker.error, parent=self)
+            return
+        # pacing follows the real processing time instead of a fixed 10 ms
+        self.after(self.worker.next_delay(), self.update_frame)
 
     def close_camera(self):
         self.running = False
-        if self.cap.isOpened():
-            self.cap.release()
+        if hasattr(self, "worker"):
+            self.worker.stop()
+        self.cap.release()
         self.destroy()
 
 class MoodDetectorWindow(Toplevel):
   
 
-    def __init__(self, parent):
+    # source: any camera.py frame source (default: shared live camera); released on close
+    def __init__(self, parent, fast=True, source=None):
         super().__init__(parent)
         self.title("Mood Detector")
         self.geometry("720x520")
@@ -165,61 +197,54 @@ class MoodDetectorWindow(Toplevel):
 
         self.video_label = Label(self, bg="black")
         self.video_label.pack(padx=10, pady=10, fill="both", expand=True)
+        self.surface = DisplaySurface(self.video_label)
+        self.flipped = None
 
         Button(self, text="Close", bg="#e74c3c", fg="white", command=self.close_camera).pack(pady=8)
 
-        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-        self.smile_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_smile.xml")
+        # fast mode: downscaled detection + tracking between full passes + smoothed label (mood.py)
+        self.detector = MoodDetector(fast=fast)
 
-        self.cap = cv2.VideoCapture(0)
+        self.cap = source if source is not None else open_camera(0)
+        self.protocol("WM_DELETE_WINDOW", self.close_camera)
         if not self.cap.isOpened():
             messagebox.showerror("Camera Error", "Could not open camera!")
             self.destroy()
             return
 
+        # detection runs on the worker thread; Tk only shows results
+        self.worker = FrameWorker(self.cap, self.process_frame).start()
         self.running = True
         self.update_frame()
 
+    def process_frame(self, frame):
+        # runs on the worker thread
+        if self.flipped is None or self.flipped.shape != frame.shape:
+            self.flipped = np.empty_like(frame)
+        frame = cv2.flip(frame, 1, dst=self.flipped)
+        faces, smiles, mood = self.detector.process(frame)
+        draw_mood(frame, faces, smiles, mood)
+        self.surface.write(frame)
+        return mood
+
     def update_frame(self):
         if not self.running:
             return
-        ret, frame = self.cap.read()
-        if not ret:
-            self.after(100, self.update_frame)
+        done = self.worker.finished()
+        mood = self.worker.latest()
+        if mood is not None:
+            self.status_label.config(text=f"Detected mood: {mood}")
+        self.surface.refresh()
+        if done:
+            self.running = False
+            self.status_label.config(text=self.worker.error or "Camera stopped.")
             return
-
-        frame = cv2.flip(frame, 1)
-        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-
-        faces = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(100, 100))
-
-        mood = "BT"
-        for (x, y, w, h) in faces:
-            cv2.rectangle(frame, (x, y), (x + w, y + h), (90, 200, 255), 2)
-
-            roi_gray = gray[y:y + h, x:x + w]
-            smiles = self.smile_cascade.detectMultiScale(roi_gray, scaleFactor=1.7, minNeighbors=20)
-
-            if len(smiles) > 0:
-                mood ="kush"
-                for (sx, sy, sw, sh) in smiles:
-                    cv2.rectangle(frame, (x + sx, y + sy), (x + sx + sw, y + sy + sh), (0, 255, 0), 1)
-                break
-
-        
-        cv2.putText(frame, f"Mood: {mood}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2, cv2.LINE_AA)
-        
-        self.status_label.config(text=f"Detected mood: {mood}")
-
-        img = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-        imgtk = ImageTk.PhotoImage(Image.fromarray(img))
-        self.video_label.imgtk = imgtk
-        self.video_label.config(image=imgtk)
-
-        self.after(60, self.update_frame) 
+        self.after(self.worker.next_delay(), self.update_frame)
 
     def close_camera(self):
         self.running = False
-        if hasattr(self, "cap") and self.cap.isOpened():
+        if hasattr(self, "worker"):
+            self.worker.stop()
+        if hasattr(self, "cap"):
             self.cap.release()
         self.destroy()
@@ -1,15 +1,237 @@
-
 import sqlite3
+import re
+import threading
+import queue
+import atexit
+import functools
+from collections import OrderedDict
+from itertools import islice
+from contextlib import contextmanager
+from auth import hash_password, verify_password, needs_rehash, burn_time
+from instrument import timed
 
 DB_NAME = "takebook.db"
 
+# pool settings — chhota app hai, 4 idle connections kaafi hain
+POOL_SIZE = 4
+BUSY_TIMEOUT = 5.0
+STATEMENT_CACHE = 128
+
+# feed pages — ek baar mein itne posts
+FEED_PAGE_SIZE = 20
+
+# feed cache — itne recent feed / author pages memory mein
+FEED_CACHE_SIZE = 64
+
+# bulk import: rows per transaction (one commit/fsync per batch instead of per row)
+BULK_BATCH = 10000
+
+# WAL lets readers keep going while a writer commits; NORMAL sync is safe in WAL mode
+PRAGMAS = (
+    "PRAGMA journal_mode=WAL",
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA cache_size=-8000",        # ~8 MB page cache per connection
+    "PRAGMA mmap_size=67108864",      # 64 MB memory-mapped reads
+    "PRAGMA temp_store=MEMORY",
+)
+
+
+class ConnectionPool:
+    # thread-safe pool of sqlite connections, shared by UI, camera threads and workers
+    def __init__(self, db_name, size=POOL_SIZE):
+        self.db_name = db_name
+        self.size = size
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._closed = False
+
+    def _connect(self):
+        # check_same_thread=False: a connection may be released by one thread and reused by another,
+        # but the pool never hands the same connection to two threads at once
+        conn = sqlite3.connect(self.db_name, timeout=BUSY_TIMEOUT, check_same_thread=False,
+                               cached_statements=STATEMENT_CACHE)
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            return self._connect()
+
+    def release(self, conn):
+        if conn.in_transaction:
+            conn.rollback()
+        if self._closed:
+            conn.close()
+            return
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    @contextmanager
+    def connection(self):
+        # commit on success, rollback on error, and always give the connection back
+        conn = self.acquire()
+        try:
+            yield conn
+            if conn.in_transaction:
+                conn.commit()
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        finally:
+            self.release(conn)
+
+    def close(self):
+        self._closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    # lazily build the pool; rebuilt if DB_NAME is pointed at another file
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool.db_name != DB_NAME:
+            if _pool is not None:
+                _pool.close()
+            _pool = ConnectionPool(DB_NAME)
+        return _pool
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+    feed_cache.close()
+
+
+atexit.register(close_pool)
+
+
 def get_conn():
-    return sqlite3.connect(DB_NAME)
+    # usage: with get_conn() as conn: ...
+    return get_pool().connection()
 
-def create_tables():
-    conn = get_conn()
-    cur = conn.cursor()
 
+class FeedCache:
+    # read-through LRU for feed / per-author pages. An entry is valid while both versions match:
+    #   writes  — bumped by add_post / add_posts_many in this process (immediate)
+    #   data_version — PRAGMA on a dedicated connection; changes whenever any *other* connection
+    #                  commits, including other processes writing to the same file
+    def __init__(self, size=FEED_CACHE_SIZE):
+        self.size = size
+        self.writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._items = OrderedDict()
+        self._version = None
+        self._watcher = None
+        self._db_name = None
+        self._lock = threading.Lock()
+
+    def _data_version(self):
+        if self._watcher is None or self._db_name != DB_NAME:
+            if self._watcher is not None:
+                self._watcher.close()
+            self._watcher = sqlite3.connect(DB_NAME, timeout=BUSY_TIMEOUT, check_same_thread=False)
+            self._db_name = DB_NAME
+            self._items.clear()
+        return self._watcher.execute("PRAGMA data_version").fetchone()[0]
+
+    def version(self):
+        # current version; drops every entry if it moved since the last call
+        with self._lock:
+            data_version = self._data_version()   # (re)connects first if DB_NAME changed
+            version = (self._db_name, data_version, self.writes)
+            if version != self._version:
+                if self._items:
+                    self.invalidations += 1
+                self._items.clear()
+                self._version = version
+            return version
+
+    def get(self, key):
+        with self._lock:
+            rows = self._items.get(key)
+            if rows is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return rows
+
+    def put(self, key, version, rows):
+        with self._lock:
+            if version != self._version:
+                return   # a write landed while the query ran
+            self._items[key] = rows
+            self._items.move_to_end(key)
+            while len(self._items) > self.size:
+                self._items.popitem(last=False)
+
+    def bump(self):
+        with self._lock:
+            self.writes += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {"entries": len(self._items), "size": self.size, "hits": self.hits, "misses": self.misses,
+                    "hit_rate": round(self.hits / total, 3) if total else 0.0,
+                    "invalidations": self.invalidations}
+
+    def close(self):
+        with self._lock:
+            if self._watcher is not None:
+                self._watcher.close()
+                self._watcher = None
+            self._items.clear()
+            self._version = None
+
+
+feed_cache = FeedCache()
+
+
+def cached(copy):
+    # read-through wrapper for read-only queries whose result depends only on the arguments;
+    # copy(result) is what callers get, so nobody can modify the cached object
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            version = feed_cache.version()
+            key = (func.__name__, args, tuple(sorted(kwargs.items())))
+            result = feed_cache.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                feed_cache.put(key, version, result)
+            return copy(result)
+        return inner
+    return wrap
+
+
+# schema migrations — PRAGMA user_version is the number of steps already applied.
+# steps 1-3 are the old ad-hoc create_tables code, written so they also work on databases
+# made before versioning existed (user_version 0 but some tables/columns already there).
+
+def _m1_base(cur):
     # Users table
     cur.execute('''
         CREATE TABLE IF NOT EXISTS users (
@@ -31,42 +253,369 @@ def create_tables():
         )
     ''')
 
-    conn.commit()
-    conn.close()
+    # per-author feed: seek straight to (author, newest id) instead of scanning posts
+    cur.execute("CREATE INDEX IF NOT EXISTS idx_posts_author_id ON posts(author, id)")
+
+
+def _m2_media(cur):
+    # managed media (media.py) — content hash and full-rendition size of the attached image
+    _add_column(cur, "posts", "image_hash", "TEXT")
+    _add_column(cur, "posts", "image_width", "INTEGER")
+    _add_column(cur, "posts", "image_height", "INTEGER")
+
+
+def _search_triggers(cur):
+    # keep posts_fts in sync with posts.content
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS posts_fts_ai AFTER INSERT ON posts BEGIN
+            INSERT INTO posts_fts(rowid, content) VALUES (new.id, new.content);
+        END
+    ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS posts_fts_ad AFTER DELETE ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, content) VALUES ('delete', old.id, old.content);
+        END
+    ''')
+    cur.execute('''
+        CREATE TRIGGER IF NOT EXISTS posts_fts_au AFTER UPDATE OF content ON posts BEGIN
+            INSERT INTO posts_fts(posts_fts, rowid, content) VALUES ('delete', old.id, old.content);
+            INSERT INTO posts_fts(rowid, content) VALUES (new.id, new.content);
+        END
+    ''')
+
+
+def _m3_search(cur):
+    # full-text search — external-content FTS5 index over posts.content, kept in sync by triggers
+    fresh = cur.execute("SELECT 1 FROM sqlite_master WHERE name='posts_fts'").fetchone() is None
+    cur.execute("CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(content, content='posts', content_rowid='id')")
+    _search_triggers(cur)
+    if fresh:
+        # database from before search existed — index the posts already there
+        cur.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
+
+
+def _m4_author_ids(cur):
+    # posts.author (the email, repeated in every row and index entry) -> integer author_id.
+    # authors is its own small table so posts by emails without a users row (imports) still work.
+    cur.execute("CREATE TABLE authors (id INTEGER PRIMARY KEY, email TEXT UNIQUE NOT NULL)")
+    cur.execute("INSERT INTO authors (email) SELECT author FROM posts GROUP BY author ORDER BY MIN(id)")
+    cur.execute('''
+        CREATE TABLE posts_new (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            author_id INTEGER NOT NULL REFERENCES authors(id),
+            content TEXT,
+            image_path TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            image_hash TEXT,
+            image_width INTEGER,
+            image_height INTEGER
+        )
+    ''')
+    # same ids, so posts_fts (keyed by rowid) stays valid without a rebuild
+    cur.execute('''
+        INSERT INTO posts_new (id, author_id, content, image_path, created_at, image_hash, image_width, image_height)
+        SELECT p.id, a.id, p.content, p.image_path, p.created_at, p.image_hash, p.image_width, p.image_height
+        FROM posts p JOIN authors a ON a.email = p.author
+        ORDER BY p.id
+    ''')
+    cur.execute("DROP TABLE posts")   # takes idx_posts_author_id and the search triggers with it
+    cur.execute("ALTER TABLE posts_new RENAME TO posts")
+    _search_triggers(cur)
+    # per-author pages: index seek on (author_id, id), rowid comes with the index entry
+    cur.execute("CREATE INDEX idx_posts_author_id ON posts(author_id, id)")
+
+
+def _m5_feed_order(cur):
+    # the feed is ordered by (created_at, id): imported / generated posts can be older than their ids.
+    # every index entry ends with the rowid, so these are (created_at, id) and (author_id, created_at, id):
+    # a page is one index seek plus 20 rowid lookups, never a sort. they don't cover the page query —
+    # that would mean copying content and image_path into the index, i.e. storing every post twice
+    cur.execute("DROP INDEX idx_posts_author_id")
+    cur.execute("CREATE INDEX idx_posts_created ON posts(created_at)")
+    cur.execute("CREATE INDEX idx_posts_author_created ON posts(author_id, created_at)")
+
+
+MIGRATIONS = [_m1_base, _m2_media, _m3_search, _m4_author_ids, _m5_feed_order]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def migrate(target=SCHEMA_VERSION):
+    # apply pending steps up to `target`, each in its own write transaction;
+    # the version is re-read under the write lock so two processes can't run the same step
+    with get_conn() as conn:
+        if conn.execute("PRAGMA user_version").fetchone()[0] >= target:
+            return
+        for version, step in enumerate(MIGRATIONS[:target], 1):
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if conn.execute("PRAGMA user_version").fetchone()[0] < version:
+                    step(conn.cursor())
+                    conn.execute(f"PRAGMA user_version={version}")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
 
 
+def create_tables():
+    migrate()
+
+
+def _add_column(cur, table, column, decl):
+    # older databases were created before the column existed
+    cols = [row[1] for row in cur.execute(f"PRAGMA table_info({table})")]
+    if column not in cols:
+        cur.execute(f"ALTER TABLE {table} ADD COLUMN {column} {decl}")
+
+
+@timed("db.add_user")
 def add_user(email, password):
-    conn = get_conn()
-    cur = conn.cursor()
+    # password is stored as a salted hash (auth.py), never as given
+    # hashing is deliberately slow — the UI calls this off the Tk thread
+    hashed = hash_password(password)
     try:
-        cur.execute("INSERT INTO users (email, password) VALUES (?, ?)", (email, password))
-        conn.commit()
+        with get_conn() as conn:
+            conn.execute("INSERT INTO users (email, password) VALUES (?, ?)", (email, hashed))
         return True
     except sqlite3.IntegrityError:
         return False
-    finally:
-        conn.close()
 
+def _user_params(user):
+    # (email, password) or {"email", "password"} -> hashed here;
+    # {"email", "password_hash"} (from an export) -> stored hash kept as is
+    if isinstance(user, dict):
+        if user.get("password_hash"):
+            return user["email"], user["password_hash"]
+        email, password = user["email"], user["password"]
+    else:
+        email, password = user
+    return email, hash_password(password)
+
+
+def _batches(rows, size):
+    it = iter(rows)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+@timed("db.add_users_many")
+def add_users_many(users, batch=BULK_BATCH):
+    # bulk add_user: executemany, one transaction per batch; existing emails are skipped
+    # returns the number of users inserted
+    added = 0
+    for chunk in _batches(users, batch):
+        params = [_user_params(u) for u in chunk]
+        with get_conn() as conn:
+            before = conn.total_changes
+            conn.executemany("INSERT OR IGNORE INTO users (email, password) VALUES (?, ?)", params)
+            added += conn.total_changes - before
+    return added
+
+
+@timed("db.verify_user")
 def verify_user(email, password):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT * FROM users WHERE email=? AND password=?", (email, password))
-    row = cur.fetchone()
-    conn.close()
-    return row is not None
+    with get_conn() as conn:
+        row = conn.execute("SELECT id, password FROM users WHERE email=?", (email,)).fetchone()
+    if row is None:
+        burn_time(password)   # unknown email takes as long as a wrong password
+        return False
+    user_id, stored = row
+    if not verify_password(password, stored):
+        return False
+    if needs_rehash(stored):
+        # plaintext / old-cost row — upgrade it now that we know the password
+        with get_conn() as conn:
+            conn.execute("UPDATE users SET password=? WHERE id=? AND password=?", (hash_password(password), user_id, stored))
+    return True
 
 
-def add_post(author, content, image_path=None):
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("INSERT INTO posts (author, content, image_path) VALUES (?, ?, ?)", (author, content, image_path))
-    conn.commit()
-    conn.close()
+# posts store author_id; every read joins authors back so rows still carry the email
+_POST_COLUMNS = ("SELECT p.id, a.email, p.content, p.image_path, p.created_at "
+                 "FROM posts p JOIN authors a ON a.id = p.author_id")
+_ADD_AUTHOR = "INSERT OR IGNORE INTO authors (email) VALUES (?)"
+_AUTHOR_ID = "(SELECT id FROM authors WHERE email=?)"
+_NEWEST_FIRST = " ORDER BY p.created_at DESC, p.id DESC"
 
+
+@timed("db.add_post")
+def add_post(author, content, image_path=None, media=None):
+    # media: media.MediaInfo from ingest_image — the feed rendition becomes image_path
+    # returns the new row in the same shape as get_posts_page rows, so the feed can show it directly
+    image_hash = width = height = None
+    if media is not None:
+        image_path, image_hash, width, height = media.feed_path, media.hash, media.width, media.height
+    with get_conn() as conn:
+        conn.execute(_ADD_AUTHOR, (author,))
+        cur = conn.execute("INSERT INTO posts (author_id, content, image_path, image_hash, image_width, image_height) "
+                           f"VALUES ({_AUTHOR_ID}, ?, ?, ?, ?, ?)", (author, content, image_path, image_hash, width, height))
+        row = conn.execute(f"{_POST_COLUMNS} WHERE p.id=?", (cur.lastrowid,)).fetchone()
+    feed_cache.bump()
+    return row
+
+def _post_params(post):
+    # (author, content[, image_path[, created_at]]) or a dict with those keys (export / CSV rows);
+    # created_at None -> now
+    if isinstance(post, dict):
+        return (post["author"], post.get("content"), post.get("image_path") or None,
+                post.get("created_at") or None)
+    author, content, image_path, created_at = (tuple(post) + (None, None))[:4]
+    return author, content, image_path, created_at
+
+
+@timed("db.add_posts_many")
+def add_posts_many(posts, batch=BULK_BATCH):
+    # bulk add_post for imports / seeding: executemany, one transaction per batch,
+    # never more than one batch in memory. returns the number of posts inserted
+    added = 0
+    for chunk in _batches(posts, batch):
+        params = [_post_params(p) for p in chunk]
+        with get_conn() as conn:
+            conn.executemany(_ADD_AUTHOR, {(p[0],) for p in params})
+            conn.executemany("INSERT INTO posts (author_id, content, image_path, created_at) "
+                             f"VALUES ({_AUTHOR_ID}, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))", params)
+        added += len(chunk)
+        feed_cache.bump()
+    return added
+
+
+@timed("db.add_posts_batch")
+def add_posts_batch(posts):
+    # group commit for the API server: a small batch of posts from different clients in one
+    # transaction; returns the new rows in input order, same shape as add_post
+    params = [_post_params(p) for p in posts]
+    if not params:
+        return []
+    with get_conn() as conn:
+        conn.executemany(_ADD_AUTHOR, {(p[0],) for p in params})
+        ids = [conn.execute("INSERT INTO posts (author_id, content, image_path, created_at) "
+                            f"VALUES ({_AUTHOR_ID}, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))", p).lastrowid
+               for p in params]
+        rows = conn.execute(f"{_POST_COLUMNS} WHERE p.id BETWEEN ? AND ?", (min(ids), max(ids))).fetchall()
+    feed_cache.bump()
+    by_id = {row[0]: row for row in rows}
+    return [by_id[i] for i in ids]
+
+
+@timed("db.get_posts")
 def get_posts():
-    conn = get_conn()
-    cur = conn.cursor()
-    cur.execute("SELECT author, content, image_path, created_at FROM posts ORDER BY id DESC")
-    rows = cur.fetchall()
-    conn.close()
+    # whole table — not cached: one call would pin every post in memory as a single entry
+    with get_conn() as conn:
+        rows = conn.execute("SELECT a.email, p.content, p.image_path, p.created_at "
+                            "FROM posts p JOIN authors a ON a.id = p.author_id" + _NEWEST_FIRST).fetchall()
     return rows
+
+
+@timed("db.get_posts_page")
+@cached(lambda page: (list(page[0]), page[1]))
+def get_posts_page(limit=FEED_PAGE_SIZE, cursor=None, author=None):
+    # keyset pagination on (created_at, id), newest first: each page is an index seek, no OFFSET scan.
+    # the cursor is the id of the last post shown; its (created_at, id) is looked up by primary key
+    # returns (rows, next_cursor); rows are (id, author, content, image_path, created_at)
+    return _query_page(limit, cursor, author)
+
+
+def _page_sql(cursor=None, author=None):
+    # (sql, args) for one feed page; the LIMIT value is the caller's last arg.
+    # shared with the tests and bench_schema so they check the query the app really runs
+    sql = _POST_COLUMNS
+    where, args = [], []
+    if author is not None:
+        where.append(f"p.author_id={_AUTHOR_ID}")
+        args.append(author)
+    if cursor is not None:
+        where.append("(p.created_at, p.id) < (SELECT created_at, id FROM posts WHERE id=?)")
+        args.append(cursor)
+    if where:
+        sql += " WHERE " + " AND ".join(where)
+    return sql + _NEWEST_FIRST + " LIMIT ?", args
+
+
+def _query_page(limit, cursor, author):
+    # uncached get_posts_page, for callers that walk the whole feed once
+    if limit <= 0:
+        raise ValueError("limit must be positive")
+    sql, args = _page_sql(cursor, author)
+    args.append(limit)
+    with get_conn() as conn:
+        rows = conn.execute(sql, args).fetchall()
+    next_cursor = rows[-1][0] if len(rows) == limit else None
+    return rows, next_cursor
+
+
+def iter_posts(author=None, batch=FEED_PAGE_SIZE * 5):
+    # streaming variant — one page in memory at a time, connection returned between pages.
+    # bypasses the feed cache: a full walk would push every hot page out of it
+    cursor = None
+    while True:
+        rows, cursor = _query_page(batch, cursor, author)
+        yield from rows
+        if cursor is None:
+            return
+
+
+def iter_posts_oldest(batch=FEED_PAGE_SIZE * 5):
+    # whole table oldest-first in feed order (export order, so a re-import gets ids in time order)
+    last = ("", 0)
+    while True:
+        with get_conn() as conn:
+            rows = conn.execute(f"{_POST_COLUMNS} WHERE (p.created_at, p.id) > (?, ?) "
+                                "ORDER BY p.created_at, p.id LIMIT ?", last + (batch,)).fetchall()
+        yield from rows
+        if len(rows) < batch:
+            return
+        last = (rows[-1][4], rows[-1][0])
+
+
+def iter_users(batch=FEED_PAGE_SIZE * 5):
+    # (id, email, password hash) in id order, one page in memory at a time — for exports
+    last = 0
+    while True:
+        with get_conn() as conn:
+            rows = conn.execute("SELECT id, email, password FROM users WHERE id>? ORDER BY id LIMIT ?",
+                                (last, batch)).fetchall()
+        yield from rows
+        if len(rows) < batch:
+            return
+        last = rows[-1][0]
+
+
+SEARCH_PAGE_SIZE = 20
+
+
+def _fts_query(text):
+    # user text -> safe FTS5 query: every word quoted (no syntax errors), prefix match for as-you-type
+    words = re.findall(r"\w+", text)
+    return " ".join(f'"{w}"*' for w in words)
+
+@timed("db.search_posts")
+def search_posts(query, limit=SEARCH_PAGE_SIZE, cursor=None, mark=("[", "]")):
+    # ranked (bm25) full-text search; cursor is the offset of the next page since rank order has no key
+    # returns (rows, next_cursor); rows are (id, author, content, image_path, created_at, highlighted, rank)
+    if limit <= 0:
+        raise ValueError("limit must be positive")
+    offset = cursor or 0
+    if offset < 0:
+        raise ValueError("cursor must not be negative")
+    match = _fts_query(query)
+    if not match:
+        return [], None
+    with get_conn() as conn:
+        rows = conn.execute('''
+            SELECT p.id, a.email, p.content, p.image_path, p.created_at,
+                   highlight(posts_fts, 0, ?, ?), posts_fts.rank
+            FROM posts_fts JOIN posts p ON p.id = posts_fts.rowid JOIN authors a ON a.id = p.author_id
+            WHERE posts_fts MATCH ?
+            ORDER BY posts_fts.rank, p.id DESC
+            LIMIT ? OFFSET ?
+        ''', (mark[0], mark[1], match, limit, offset)).fetchall()
+    next_cursor = offset + limit if len(rows) == limit else None
+    return rows, next_cursor
+
+@timed("db.rebuild_search_index")
+def rebuild_search_index():
+    # backfill / repair the FTS index from the posts table
+    with get_conn() as conn:
+        conn.execute("INSERT INTO posts_fts(posts_fts) VALUES ('rebuild')")
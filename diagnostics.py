@@ -0,0 +1,80 @@
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import instrument
+from thumbs import photo_cache
+from db_simple import feed_cache
+from utils import BG_COLOR, WHITE_COLOR, PRIMARY_COLOR, FONT_BOLD, GREY_TEXT
+
+REFRESH_MS = 1000
+
+
+# Diagnostics tab — live view of instrument.py timers/counters, with JSON export
+class DiagnosticsPanel(tk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, bg=BG_COLOR)
+        bar = tk.Frame(self, bg=BG_COLOR)
+        bar.pack(fill="x", pady=(0, 6))
+        self.toggle_btn = tk.Button(bar, bg=PRIMARY_COLOR, fg="white", font=(FONT_BOLD, 10), command=self.toggle)
+        self.toggle_btn.pack(side="left", padx=(0, 6))
+        tk.Button(bar, text="Reset", font=(FONT_BOLD, 10), command=self.reset).pack(side="left", padx=6)
+        tk.Button(bar, text="Export JSON", font=(FONT_BOLD, 10), command=self.export).pack(side="left", padx=6)
+        self.status = tk.Label(bar, bg=BG_COLOR, fg=GREY_TEXT, font=("Arial", 9))
+        self.status.pack(side="right")
+
+        self.text = tk.Text(self, bg=WHITE_COLOR, font=("Courier", 10), relief="flat", wrap="none")
+        self.text.pack(fill="both", expand=True)
+        self._after_id = None
+        self.refresh()
+
+    def render(self, snap):
+        lines = [f"{'timer':<26}{'count':>8}{'mean ms':>10}{'p50':>9}{'p95':>9}{'max':>10}"]
+        for name, t in snap["timers"].items():
+            if t["count"]:
+                lines.append(f"{name:<26}{t['count']:>8}{t['mean_ms']:>10.2f}{t['p50_ms']:>9.2f}"
+                             f"{t['p95_ms']:>9.2f}{t['max_ms']:>10.2f}")
+        if snap["counters"]:
+            lines += ["", "counters"] + [f"  {k:<24}{v:>10}" for k, v in snap["counters"].items()]
+        lines += ["", f"photo cache: {photo_cache.hits} hits, {photo_cache.misses} misses, "
+                      f"{photo_cache.used // 1024} KB / {photo_cache.budget // 1024} KB"]
+        fc = feed_cache.stats()
+        lines.append(f"feed cache: {fc['hits']} hits, {fc['misses']} misses, {fc['entries']}/{fc['size']} pages, "
+                     f"{fc['invalidations']} invalidations")
+        errors = snap["errors"]
+        lines += ["", f"errors: {errors['count']}"] + [f"  {e['where']}: {e['error']}" for e in errors["recent"][-10:]]
+        return "\n".join(lines)
+
+    def refresh(self):
+        snap = instrument.registry.snapshot()
+        self.toggle_btn.config(text="Disable timing" if snap["enabled"] else "Enable timing")
+        self.status.config(text=f"uptime {snap['uptime_s']:.0f}s" if snap["enabled"]
+                           else f"timing off — {instrument.ENV_VAR}=1 to start with it on")
+        top = self.text.yview()[0]
+        self.text.config(state="normal")
+        self.text.delete("1.0", tk.END)
+        self.text.insert("1.0", self.render(snap))
+        self.text.config(state="disabled")
+        self.text.yview_moveto(top)
+        self._after_id = self.after(REFRESH_MS, self.refresh)
+
+    def toggle(self):
+        instrument.enable(not instrument.enabled())
+        self.after_cancel(self._after_id)
+        self.refresh()
+
+    def reset(self):
+        instrument.registry.reset()
+        self.after_cancel(self._after_id)
+        self.refresh()
+
+    def export(self):
+        path = filedialog.asksaveasfilename(defaultextension=".json", initialfile=instrument.EXPORT_FILE,
+                                            filetypes=[("JSON", "*.json")])
+        if path:
+            instrument.export(path)
+            messagebox.showinfo("Diagnostics", f"Saved to {path}")
+
+    def destroy(self):
+        if self._after_id is not None:
+            self.after_cancel(self._after_id)
+            self._after_id = None
+        super().destroy()
@@ -0,0 +1,140 @@
+import threading
+import tracemalloc
+import numpy as np
+from PIL import Image, ImageTk
+from instrument import timed
+
+# reusable display surface for camera windows.
+# worker thread: surface.write(bgr_frame) unpacks BGR straight into one of three preallocated
+#   RGBA *block* images (one pass, no intermediate array).
+# Tk thread: surface.refresh() pastes the newest one into one persistent PhotoImage. Block images
+#   in the PhotoImage's own mode are blitted as is; anything else (e.g. Image.frombuffer views)
+#   makes ImageTk allocate and convert a full frame on every paste.
+# three buffers, so the worker always has one that is neither shown-in-progress nor newest.
+
+BUFFERS = 3
+
+
+# both helpers use Pillow internals (Image.core.new_block / get_stats, checked on Pillow 12.3) and
+# fall back when a release doesn't have them: a plain Image.new buffer still works, paste just
+# converts it on every frame again; without get_stats the image counters stay at 0
+_HAS_BLOCKS = hasattr(Image.core, "new_block") and hasattr(Image.Image, "_new")
+_HAS_STATS = hasattr(Image.core, "get_stats")
+
+
+def _block_image(w, h):
+    # contiguous RGBA image, the layout PhotoImage.paste can blit without converting
+    if _HAS_BLOCKS:
+        return Image.Image()._new(Image.core.new_block("RGBA", (w, h)))
+    return Image.new("RGBA", (w, h))
+
+
+def _pil_images():
+    # process-wide count of images Pillow has created (block or not)
+    return Image.core.get_stats()["new_count"] if _HAS_STATS else 0
+
+
+class DisplaySurface:
+    def __init__(self, label):
+        self.label = label
+        self.shape = None
+        self.images = []
+        self.photo = None
+        self.latest = None       # index of newest finished buffer
+        self.showing = None      # index Tk is pasting from right now
+        self.fresh = False
+        self.lock = threading.Lock()
+        # measured, not assumed: Pillow images created inside write()/refresh() (each one a full
+        # frame of pixels, malloc'd by Pillow where tracemalloc can't see it), plus Python-side
+        # bytes when tracemalloc is on. Pillow's counter is process-wide, so thumbnail decodes
+        # running at the same moment can show up here too.
+        self.frames = 0
+        self.pil_images = 0      # steady state only; buffer (re)allocation is counted as setup
+        self.traced_bytes = 0
+        self.setup_images = 0
+        self.bytes_last_frame = 0
+        self._frame_bytes = 0
+        self._setup = False
+
+    def _measure(self, func, *args):
+        images = _pil_images()
+        traced = tracemalloc.is_tracing()
+        before = tracemalloc.get_traced_memory()[0] if traced else 0
+        result = func(*args)
+        new_bytes = max(tracemalloc.get_traced_memory()[0] - before, 0) if traced else 0
+        new_images = _pil_images() - images   # after the traced window: get_stats itself allocates
+        with self.lock:
+            if self._setup:
+                self.setup_images += new_images
+                self._setup = False
+            else:
+                self.pil_images += new_images
+                self.traced_bytes += new_bytes
+                self._frame_bytes += new_images * self._image_bytes() + new_bytes
+        return result
+
+    def _image_bytes(self):
+        return self.shape[0] * self.shape[1] * 4 if self.shape else 0
+
+    def _alloc(self, h, w):
+        # only on the first frame or when the source resolution changes
+        self.images = [_block_image(w, h) for _ in range(BUFFERS)]
+        self.shape = (h, w)
+        self.latest = self.showing = None
+        self.fresh = False
+        self._setup = True
+
+    def _write(self, frame):
+        if frame.ndim != 3 or frame.shape[2] != 3:
+            raise ValueError(f"DisplaySurface.write expects a BGR frame, got shape {frame.shape}")
+        h, w = frame.shape[:2]
+        with self.lock:
+            if self.shape != (h, w):
+                self._alloc(h, w)
+            idx = next(i for i in range(BUFFERS) if i != self.latest and i != self.showing)
+        self.images[idx].frombytes(np.ascontiguousarray(frame), "raw", "BGR")
+        with self.lock:
+            if self.shape == (h, w):
+                self.latest = idx
+                self.fresh = True
+
+    @timed("cv.display_convert")
+    def write(self, frame):
+        # worker side: BGR uint8 frame (h, w, 3) only -> free RGBA block image, then publish it.
+        # filters.py chains always return BGR; convert gray frames with cv2.cvtColor before this
+        self._measure(self._write, frame)
+        with self.lock:
+            self.frames += 1
+            self.bytes_last_frame, self._frame_bytes = self._frame_bytes, 0
+
+    def _paste(self):
+        with self.lock:
+            if not self.fresh:
+                return False
+            idx = self.showing = self.latest
+            self.fresh = False
+            h, w = self.shape
+            image = self.images[idx]
+        if self.photo is None or (self.photo.height(), self.photo.width()) != (h, w):
+            self.photo = ImageTk.PhotoImage("RGBA", (w, h))
+            with self.lock:
+                self._setup = True
+            self.label.config(image=self.photo)
+            self.label.imgtk = self.photo
+        self.photo.paste(image)
+        with self.lock:
+            self.showing = None
+        return True
+
+    @timed("cv.display_paste")
+    def refresh(self):
+        # Tk side: show the newest frame, if there is one; returns True when something changed
+        return self._measure(self._paste)
+
+    def stats(self):
+        # steady state should read 0 PIL images per frame; anything else means paste is converting
+        with self.lock:
+            return {"frames": self.frames, "pil_images": self.pil_images, "setup_images": self.setup_images,
+                    "pil_images_per_frame": round(self.pil_images / self.frames, 3) if self.frames else 0.0,
+                    "bytes_last_frame": self.bytes_last_frame,
+                    "traced_bytes": self.traced_bytes if tracemalloc.is_tracing() else None}
@@ -0,0 +1,266 @@
+import tkinter as tk
+from bisect import bisect_right
+from thumbs import ImageLoader
+from instrument import timed
+from utils import BG_COLOR, WHITE_COLOR, SEPARATOR_COLOR, FONT_BOLD, GREY_TEXT
+
+CARD_GAP = 16          # vertical space between cards (pady=8 top + bottom)
+EST_CARD_HEIGHT = 110  # guess for cards that were never measured
+OVERSCAN = 400         # px rendered above/below the viewport so fast scrolls don't show gaps
+SPARE_CARDS = 6        # recycled cards kept around; baaki destroy
+PREFETCH_ROWS = 10     # fetch the next page when this close to the end
+
+
+# one post card — widgets are created once and re-bound to different rows while scrolling
+class PostCard(tk.Frame):
+    def __init__(self, parent):
+        super().__init__(parent, bg=WHITE_COLOR, highlightbackground=SEPARATOR_COLOR, highlightthickness=1)
+        self.author = tk.Label(self, font=(FONT_BOLD, 12), bg=WHITE_COLOR)
+        self.author.pack(anchor="w", padx=15, pady=(8, 0))
+        self.time = tk.Label(self, fg=GREY_TEXT, font=("Arial", 9), bg=WHITE_COLOR)
+        self.time.pack(anchor="w", padx=15)
+        self.content = tk.Label(self, bg=WHITE_COLOR, font=("Arial", 12), wraplength=600, justify="left")
+        self.content.pack(anchor="w", padx=15, pady=(5, 10))
+        self.image = tk.Label(self, bg=WHITE_COLOR, fg=GREY_TEXT, font=("Arial", 10))
+        self.row = None
+        self.index = None
+        self.token = None   # pending image job
+
+    @timed("feed.bind_row")
+    def bind_row(self, row):
+        self.row = row
+        _, author, content, _, created = row
+        self.author.config(text=author)
+        self.time.config(text=str(created).split('.')[0])
+        self.content.config(text=content)
+        self.set_image(None)
+
+    def set_image(self, photo):
+        # photo=None hides the image slot
+        self.image.image = photo
+        if photo is None:
+            self.image.config(image="", text="")
+            self.image.pack_forget()
+        else:
+            self.image.config(image=photo, text="", height=0)
+            self.image.pack(padx=15, pady=5)
+
+    def set_placeholder(self):
+        # shown until the decoded image arrives from the loader
+        self.image.image = None
+        self.image.config(image="", text="Loading image…", height=4)
+        self.image.pack(padx=15, pady=5)
+
+
+# scrolling feed that only keeps cards for rows in or near the viewport
+class VirtualFeed(tk.Frame):
+    def __init__(self, parent, fetch_page, empty_text="No posts yet.", **kwargs):
+        super().__init__(parent, bg=BG_COLOR, **kwargs)
+        # fetch_page(cursor) -> (rows, next_cursor); next_cursor None means no more pages
+        self.fetch_page = fetch_page
+        self.empty_text = empty_text
+
+        self.canvas = tk.Canvas(self, bg=BG_COLOR, highlightthickness=0, yscrollincrement=20)
+        self.scrollbar = tk.Scrollbar(self, orient="vertical", command=self._yview)
+        self.canvas.config(yscrollcommand=self.scrollbar.set)
+        self.scrollbar.pack(side="right", fill="y")
+        self.canvas.pack(side="left", fill="both", expand=True)
+
+        self.canvas.bind("<Configure>", lambda e: self._refresh())
+        self._bind_wheel(True)
+
+        self.empty_label = None
+        self._pending = {}
+        self.loader = ImageLoader(self)
+        self._reset_state()
+        self.load_more()
+
+    def _reset_state(self):
+        self.rows = []
+        self.heights = []
+        self.offsets = [0]     # offsets[i] = y of row i, offsets[-1] = total height
+        self.cursor = None
+        self.exhausted = False
+        self.active = {}       # row index -> card
+        self.spare = []        # unbound cards ready for reuse
+        self.windows = {}      # card -> canvas window id
+
+    # ---- data ----
+
+    def load_more(self):
+        if self.exhausted:
+            return
+        rows, self.cursor = self.fetch_page(self.cursor)
+        self.exhausted = self.cursor is None
+        self.rows.extend(rows)
+        for _ in rows:
+            self.heights.append(EST_CARD_HEIGHT)
+            self.offsets.append(self.offsets[-1] + EST_CARD_HEIGHT)
+        self._show_empty(not self.rows)
+        self._refresh()
+
+    def prepend(self, row):
+        # new post on top — existing cards stay, only their indices/offsets shift
+        self.rows.insert(0, row)
+        self.heights.insert(0, EST_CARD_HEIGHT)
+        self.offsets = [0] + [o + EST_CARD_HEIGHT for o in self.offsets]
+        self.active = {i + 1: card for i, card in self.active.items()}
+        for i, card in self.active.items():
+            card.index = i
+        self._show_empty(False)
+        self._refresh()
+
+    def reset(self, fetch_page=None):
+        # new query (or same query from the top) — cards are recycled, not rebuilt
+        if fetch_page is not None:
+            self.fetch_page = fetch_page
+        for card in list(self.active.values()):
+            self._recycle(card)
+        spare, windows = self.spare, self.windows
+        self._reset_state()
+        self.spare, self.windows = spare, windows
+        self.canvas.yview_moveto(0)
+        self.load_more()
+
+    def _show_empty(self, empty):
+        if empty and self.empty_label is None:
+            self.empty_label = tk.Label(self.canvas, text=self.empty_text, bg=BG_COLOR, fg=GREY_TEXT)
+            self.canvas.create_window(0, 30, anchor="n", window=self.empty_label, tags="empty")
+        elif empty:
+            self.empty_label.config(text=self.empty_text)
+        elif not empty and self.empty_label is not None:
+            self.canvas.delete("empty")
+            self.empty_label.destroy()
+            self.empty_label = None
+
+    # ---- layout ----
+
+    def _set_height(self, i, h):
+        delta = h - self.heights[i]
+        if not delta:
+            return False
+        self.heights[i] = h
+        for j in range(i + 1, len(self.offsets)):
+            self.offsets[j] += delta
+        return True
+
+    def _visible_range(self):
+        top = self.canvas.canvasy(0)
+        bottom = top + self.canvas.winfo_height()
+        first = max(bisect_right(self.offsets, top - OVERSCAN) - 1, 0)
+        last = min(bisect_right(self.offsets, bottom + OVERSCAN), len(self.rows))
+        return first, last
+
+    @timed("feed.refresh")
+    def _refresh(self):
+        width = self.canvas.winfo_width()
+        if width <= 1:
+            return  # not mapped yet; <Configure> will call again
+
+        first, last = self._visible_range()
+        for i in [i for i in self.active if i < first or i >= last]:
+            self._recycle(self.active.pop(i))
+        for i in range(first, last):
+            if i not in self.active:
+                card = self._take_card()
+                card.index = i
+                card.bind_row(self.rows[i])
+                self.on_bind(card, self.rows[i])
+                self.active[i] = card
+
+        for i, card in self.active.items():
+            win = self.windows[card]
+            self.canvas.coords(win, 10, self.offsets[i] + CARD_GAP // 2)
+            self.canvas.itemconfig(win, width=width - 20, state="normal")
+        self.canvas.config(scrollregion=(0, 0, width, self.offsets[-1]))
+        self.canvas.coords("empty", width // 2, 30)
+
+        if not self.exhausted and last >= len(self.rows) - PREFETCH_ROWS:
+            self._later(self.load_more)
+
+    def _on_card_resize(self, card, height):
+        # real height known only after Tk lays the card out; shift the rows below it
+        if card.row is None:
+            return
+        if self._set_height(card.index, height + CARD_GAP):
+            self._later(self._refresh)
+
+    def _later(self, fn):
+        # one pending idle call per function, cancelled if the feed is destroyed
+        name = fn.__name__
+        if name in self._pending:
+            return
+
+        def run():
+            self._pending.pop(name, None)
+            fn()
+        self._pending[name] = self.after_idle(run)
+
+    def destroy(self):
+        for after_id in self._pending.values():
+            self.after_cancel(after_id)
+        self._pending.clear()
+        self.loader.close()
+        self._bind_wheel(False)
+        super().destroy()
+
+    def on_bind(self, card, row):
+        # image decode happens off the Tk thread; card shows a placeholder meanwhile
+        image = row[3]
+        if image:
+            card.set_placeholder()
+            card.token = self.loader.request(image, lambda photo, c=card, r=row: self._image_ready(c, r, photo))
+
+    def _image_ready(self, card, row, photo):
+        if card.row is row:
+            card.token = None
+            card.set_image(photo)
+
+    def _take_card(self):
+        if self.spare:
+            return self.spare.pop()
+        card = PostCard(self.canvas)
+        card.bind("<Configure>", lambda e, c=card: self._on_card_resize(c, e.height))
+        self.windows[card] = self.canvas.create_window(0, 0, anchor="nw", window=card)
+        return card
+
+    def _recycle(self, card):
+        if card.token is not None:
+            self.loader.cancel(card.token)
+            card.token = None
+        card.set_image(None)
+        card.row = card.index = None
+        if len(self.spare) < SPARE_CARDS:
+            self.canvas.itemconfig(self.windows[card], state="hidden")
+            self.spare.append(card)
+        else:
+            self.canvas.delete(self.windows.pop(card))
+            card.destroy()
+
+    # ---- scrolling ----
+
+    def _yview(self, *args):
+        self.canvas.yview(*args)
+        self._refresh()
+
+    def _on_wheel(self, event):
+        # wheel sirf tab jab pointer feed ke upar ho
+        over = self.winfo_containing(event.x_root, event.y_root)
+        if over is None or not str(over).startswith(str(self)):
+            return
+        if event.num == 4 or event.delta > 0:
+            step = -3
+        else:
+            step = 3
+        self.canvas.yview_scroll(step, "units")
+        self._refresh()
+
+    def _bind_wheel(self, on):
+        if on:
+            self.canvas.bind_all("<MouseWheel>", self._on_wheel)
+            self.canvas.bind_all("<Button-4>", self._on_wheel)
+            self.canvas.bind_all("<Button-5>", self._on_wheel)
+        else:
+            self.canvas.unbind_all("<MouseWheel>")
+            self.canvas.unbind_all("<Button-4>")
+            self.canvas.unbind_all("<Button-5>")
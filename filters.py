@@ -0,0 +1,166 @@
+import numpy as np
+import cv2
+
+# filter graph for VideoFilterWindow.
+# every filter writes into a caller-owned dst of the same shape (BGR uint8); kernels, masks and
+# scratch buffers are built once per frame size, so steady-state frames allocate nothing.
+
+FILTERS = {}
+
+
+def register(cls):
+    FILTERS[cls.name] = cls
+    return cls
+
+
+class Filter:
+    name = ""
+
+    def __init__(self):
+        self.shape = None
+
+    def prepare(self, shape):
+        # (re)build size-dependent state; only runs when the frame size changes
+        self.shape = shape
+
+    def apply(self, src, dst):
+        raise NotImplementedError
+
+    def __call__(self, src, dst):
+        if src.shape != self.shape:
+            self.prepare(src.shape)
+        self.apply(src, dst)
+        return dst
+
+
+@register
+class Normal(Filter):
+    name = "Normal"
+
+    def apply(self, src, dst):
+        if src is not dst:
+            np.copyto(dst, src)
+
+
+@register
+class Grayscale(Filter):
+    name = "Grayscale"
+
+    def prepare(self, shape):
+        super().prepare(shape)
+        self.gray = np.empty(shape[:2], np.uint8)
+
+    def apply(self, src, dst):
+        cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        cv2.cvtColor(self.gray, cv2.COLOR_GRAY2BGR, dst=dst)
+
+
+@register
+class Sepia(Filter):
+    name = "Sepia"
+    # rows are B, G, R outputs for a BGR input (same numbers as the old per-frame np.array)
+    KERNEL = np.array([[0.272, 0.534, 0.131],
+                       [0.349, 0.686, 0.168],
+                       [0.393, 0.769, 0.189]], np.float32)
+
+    def apply(self, src, dst):
+        # uint8 output saturates by itself — no clip/astype pass needed
+        cv2.transform(src, self.KERNEL, dst=dst)
+
+
+@register
+class Invert(Filter):
+    name = "Invert"
+
+    def apply(self, src, dst):
+        cv2.bitwise_not(src, dst=dst)
+
+
+@register
+class Blur(Filter):
+    name = "Blur"
+    KSIZE = (15, 15)
+
+    def apply(self, src, dst):
+        cv2.GaussianBlur(src, self.KSIZE, 0, dst=dst)
+
+
+@register
+class Cartoon(Filter):
+    name = "Cartoon"
+
+    def prepare(self, shape):
+        super().prepare(shape)
+        self.gray = np.empty(shape[:2], np.uint8)
+        self.smooth = np.empty(shape[:2], np.uint8)
+        self.edges = np.empty(shape[:2], np.uint8)
+        self.color = np.empty(shape, np.uint8)
+
+    def apply(self, src, dst):
+        cv2.cvtColor(src, cv2.COLOR_BGR2GRAY, dst=self.gray)
+        cv2.medianBlur(self.gray, 5, dst=self.smooth)
+        cv2.adaptiveThreshold(self.smooth, 255, cv2.ADAPTIVE_THRESH_MEAN_C,
+                              cv2.THRESH_BINARY, 9, 9, dst=self.edges)
+        cv2.bilateralFilter(src, 9, 250, 250, dst=self.color)
+        # masked ops leave dst untouched outside the mask, so start from black
+        dst.fill(0)
+        cv2.bitwise_and(self.color, self.color, dst=dst, mask=self.edges)
+
+
+@register
+class Vignette(Filter):
+    name = "Vignette"
+    STRENGTH = 0.6   # 0 = no darkening, 1 = black corners
+
+    def prepare(self, shape):
+        super().prepare(shape)
+        h, w = shape[:2]
+        # separable gaussian falloff, built once per frame size
+        ky = cv2.getGaussianKernel(h, h * 0.6)
+        kx = cv2.getGaussianKernel(w, w * 0.6)
+        mask = ky @ kx.T
+        mask = 1.0 - self.STRENGTH * (1.0 - mask / mask.max())
+        self.mask = np.repeat(mask.astype(np.float32)[:, :, None], shape[2], axis=2)
+
+    def apply(self, src, dst):
+        cv2.multiply(src, self.mask, dst=dst, dtype=cv2.CV_8U)
+
+
+class Chain:
+    # filters run one after another, ping-ponging between two preallocated buffers
+    def __init__(self, filters):
+        self.filters = list(filters)
+        self.names = [f.name for f in self.filters]
+        self.bufs = None
+
+    def run(self, frame):
+        # returns a buffer owned by the chain — consume or copy it before the next run()
+        if self.bufs is None or self.bufs[0].shape != frame.shape:
+            self.bufs = (np.empty_like(frame), np.empty_like(frame))
+        src = frame
+        for i, f in enumerate(self.filters):
+            dst = self.bufs[i % 2]
+            f(src, dst)
+            src = dst
+        return src if self.filters else frame
+
+
+# ready-made chains shown next to the single filters
+PRESETS = {
+    "Vintage": ["Sepia", "Blur", "Vignette"],
+    "Noir": ["Grayscale", "Vignette"],
+}
+
+
+def filter_names():
+    return list(FILTERS) + list(PRESETS)
+
+
+def build(spec):
+    # spec: a filter / preset name, a "Sepia > Blur > Vignette" string, or a list of names
+    if isinstance(spec, str):
+        spec = PRESETS.get(spec, [s.strip() for s in spec.split(">")])
+    unknown = [s for s in spec if s not in FILTERS]
+    if unknown:
+        raise KeyError(f"unknown filter: {', '.join(unknown)}")
+    return Chain(FILTERS[s]() for s in spec if s != "Normal")
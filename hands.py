@@ -0,0 +1,111 @@
+import atexit
+import threading
+from instrument import span
+
+# one long-lived MediaPipe Hands engine shared by every snake game.
+# the graph is built on first use (or by cv.warm_up after login), reset between rounds so a
+# new game doesn't start from the last round's hand position, and closed once at exit.
+# lower-end machines: configure(model_complexity=0, max_num_hands=1) trades accuracy for speed.
+
+MODEL_COMPLEXITY = 1        # 0 = lite model, 1 = full (mediapipe default)
+MAX_NUM_HANDS = 2
+MIN_DETECTION_CONFIDENCE = 0.7
+MIN_TRACKING_CONFIDENCE = 0.7
+
+_mp = None
+
+
+def mediapipe_solutions():
+    # mediapipe is the slowest import of the lot; only the snake game needs it
+    global _mp
+    if _mp is None:
+        import mediapipe as mp
+        _mp = mp.solutions
+    return _mp.hands, _mp.drawing_utils
+
+
+class HandTracker:
+    def __init__(self, model_complexity=MODEL_COMPLEXITY, max_num_hands=MAX_NUM_HANDS,
+                 min_detection_confidence=MIN_DETECTION_CONFIDENCE,
+                 min_tracking_confidence=MIN_TRACKING_CONFIDENCE):
+        self.config = dict(model_complexity=model_complexity, max_num_hands=max_num_hands,
+                           min_detection_confidence=min_detection_confidence,
+                           min_tracking_confidence=min_tracking_confidence)
+        self.lock = threading.Lock()   # one graph, so games running at once take turns per frame
+        self._hands = None
+        self.rounds = 0
+
+    @property
+    def loaded(self):
+        return self._hands is not None
+
+    def load(self):
+        # model load + graph init; the expensive part, done once
+        with self.lock:
+            if self._hands is None:
+                mp_hands, _ = mediapipe_solutions()
+                self._hands = mp_hands.Hands(**self.config)
+        return self
+
+    def process(self, rgb):
+        if self._hands is None:
+            self.load()
+        with self.lock, span("cv.hands"):
+            return self._hands.process(rgb)
+
+    def reset(self):
+        # forget tracked hands between rounds; keeps the loaded model
+        with self.lock:
+            if self._hands is not None:
+                self._hands.reset()
+            self.rounds += 1
+
+    def draw(self, frame, hand_landmarks):
+        mp_hands, mp_draw = mediapipe_solutions()
+        mp_draw.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+
+    def close(self):
+        with self.lock:
+            if self._hands is not None:
+                self._hands.close()
+                self._hands = None
+
+
+_tracker = None
+_tracker_lock = threading.Lock()
+
+
+def get_tracker():
+    # shared engine, created (not loaded) on first call
+    global _tracker
+    with _tracker_lock:
+        if _tracker is None:
+            _tracker = HandTracker()
+        return _tracker
+
+
+def configure(**config):
+    # change model settings for later games, e.g. configure(model_complexity=0, max_num_hands=1);
+    # the old graph is closed and the new one is built lazily
+    global _tracker
+    unknown = set(config) - set(HandTracker().config)
+    if unknown:
+        raise TypeError("unknown hand tracker option(s): " + ", ".join(sorted(unknown)))
+    with _tracker_lock:
+        old = _tracker
+        merged = dict(old.config if old is not None else {}, **config)
+        _tracker = HandTracker(**merged)
+    if old is not None:
+        old.close()
+    return _tracker
+
+
+def shutdown():
+    global _tracker
+    with _tracker_lock:
+        tracker, _tracker = _tracker, None
+    if tracker is not None:
+        tracker.close()
+
+
+atexit.register(shutdown)
@@ -0,0 +1,223 @@
+import os
+import io
+import json
+import time
+import atexit
+import pstats
+import bisect
+import threading
+import functools
+from collections import deque
+from contextlib import nullcontext
+
+# hot-path instrumentation: timers, counters and latency histograms for DB calls, feed renders,
+# image decodes and CV stages. Shown in the Diagnostics tab, exportable as JSON.
+#   TAKEBOOK_INSTRUMENT=1        timers + counters on
+#   TAKEBOOK_INSTRUMENT=profile  same, plus cProfile (Tk thread) and tracemalloc for the whole run;
+#                                results go into the JSON export and PROFILE_FILE at exit
+# off by default: a decorated call then costs one attribute check.
+
+ENV_VAR = "TAKEBOOK_INSTRUMENT"
+PROFILE_FILE = "takebook.prof"
+EXPORT_FILE = "takebook-diagnostics.json"
+RECENT_ERRORS = 50
+
+# histogram bucket upper bounds in ms, 1-2-5 steps from 50 µs to 10 s
+BOUNDS = [0.05, 0.1, 0.2, 0.5, 1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000]
+
+
+class Histogram:
+    __slots__ = ("counts", "n", "total", "min", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)   # last bucket = over the top bound
+        self.n = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = 0.0
+
+    def add(self, ms):
+        self.counts[bisect.bisect_left(BOUNDS, ms)] += 1
+        self.n += 1
+        self.total += ms
+        if ms < self.min:
+            self.min = ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, q):
+        # upper bound of the bucket holding the q-th sample (capped at the real max)
+        if not self.n:
+            return 0.0
+        target, seen = q * self.n, 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= target:
+                return min(BOUNDS[i] if i < len(BOUNDS) else self.max, self.max)
+        return self.max
+
+    def snapshot(self):
+        if not self.n:
+            return {"count": 0}
+        return {"count": self.n, "total_ms": round(self.total, 2), "mean_ms": round(self.total / self.n, 3),
+                "min_ms": round(self.min, 3), "max_ms": round(self.max, 3),
+                "p50_ms": round(self.percentile(0.5), 3), "p95_ms": round(self.percentile(0.95), 3),
+                "p99_ms": round(self.percentile(0.99), 3),
+                "buckets": {("<=%g" % BOUNDS[i] if i < len(BOUNDS) else ">%g" % BOUNDS[-1]): c
+                            for i, c in enumerate(self.counts) if c}}
+
+
+class Registry:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.timers = {}
+        self.counters = {}
+        self.errors = deque(maxlen=RECENT_ERRORS)
+        self.error_count = 0
+        self.started = time.time()
+        self._lock = threading.Lock()
+
+    def record(self, name, ms):
+        with self._lock:
+            hist = self.timers.get(name)
+            if hist is None:
+                hist = self.timers[name] = Histogram()
+            hist.add(ms)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def error(self, where, exc):
+        # kept even when timing is off — failures are rare and worth seeing
+        with self._lock:
+            self.error_count += 1
+            self.errors.append({"time": round(time.time(), 3), "where": where,
+                                "error": f"{type(exc).__name__}: {exc}"})
+
+    def reset(self):
+        with self._lock:
+            self.timers.clear()
+            self.counters.clear()
+            self.errors.clear()
+            self.error_count = 0
+            self.started = time.time()
+
+    def snapshot(self):
+        with self._lock:
+            return {"enabled": self.enabled, "uptime_s": round(time.time() - self.started, 1),
+                    "timers": {k: h.snapshot() for k, h in sorted(self.timers.items())},
+                    "counters": dict(sorted(self.counters.items())),
+                    "errors": {"count": self.error_count, "recent": list(self.errors)}}
+
+
+_mode = os.environ.get(ENV_VAR, "").strip().lower()
+registry = Registry(enabled=_mode not in ("", "0", "off", "false"))
+
+
+def enabled():
+    return registry.enabled
+
+
+def enable(on=True):
+    registry.enabled = on
+
+
+def timed(name):
+    # decorator; the name is fixed at decoration time, e.g. @timed("db.get_posts_page")
+    def wrap(func):
+        @functools.wraps(func)
+        def inner(*args, **kwargs):
+            if not registry.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                registry.record(name, (time.perf_counter() - start) * 1000)
+        return inner
+    return wrap
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        registry.record(self.name, (time.perf_counter() - self.start) * 1000)
+
+
+_NOOP = nullcontext()
+
+
+def span(name):
+    # with span("cv.face_cascade"): ...  — for stages inside a function
+    return _Span(name) if registry.enabled else _NOOP
+
+
+def count(name, n=1):
+    if registry.enabled:
+        registry.count(name, n)
+
+
+def error(where, exc):
+    registry.error(where, exc)
+
+
+# opt-in capture mode
+
+_profiler = None
+
+
+def start_capture():
+    # cProfile on the calling (Tk) thread + tracemalloc everywhere; no-op unless mode is "profile"
+    global _profiler
+    if _mode != "profile" or _profiler is not None:
+        return False
+    import cProfile
+    import tracemalloc
+    tracemalloc.start()
+    _profiler = cProfile.Profile()
+    _profiler.enable()
+    atexit.register(stop_capture)
+    return True
+
+
+def capture_report(top=25):
+    report = {}
+    if _profiler is not None:
+        # Stats() stops the profiler, so it is switched back on afterwards
+        out = io.StringIO()
+        pstats.Stats(_profiler, stream=out).sort_stats("cumulative").print_stats(top)
+        _profiler.enable()
+        report["cprofile"] = out.getvalue()
+    import tracemalloc
+    if tracemalloc.is_tracing():
+        current, peak = tracemalloc.get_traced_memory()
+        stats = tracemalloc.take_snapshot().statistics("lineno")[:top]
+        report["tracemalloc"] = {"current_kb": current // 1024, "peak_kb": peak // 1024,
+                                 "top": [str(s) for s in stats]}
+    return report
+
+
+def stop_capture():
+    global _profiler
+    if _profiler is None:
+        return
+    export(EXPORT_FILE)
+    _profiler.disable()
+    _profiler.dump_stats(PROFILE_FILE)
+    _profiler = None
+
+
+def export(path=EXPORT_FILE):
+    data = registry.snapshot()
+    data.update(capture_report())
+    with open(path, "w") as f:
+        json.dump(data, f, indent=2)
+    return path
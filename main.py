@@ -2,8 +2,10 @@
 from db_simple import create_tables
 from ui import FacebookLogin
 import tkinter as tk
+import instrument
 
 if __name__ == "__main__":
+    instrument.start_capture()  # only with TAKEBOOK_INSTRUMENT=profile
     create_tables()  # ensure DB ready
     root = tk.Tk()
     FacebookLogin(root)
@@ -0,0 +1,164 @@
+import sys
+import csv
+import json
+import time
+import random
+import argparse
+from datetime import datetime, timedelta, timezone
+from itertools import islice
+import db_simple
+from auth import hash_password
+
+
+# maintenance commands for takebook.db — python manage.py <command>
+#   reindex                          rebuild the search index
+#   export posts|users FILE          stream a table out as JSONL or CSV (by extension, "-" = stdout)
+#   import posts|users FILE          stream JSONL / CSV rows in with the bulk APIs
+#   generate --posts N --users M     fill the database with synthetic data for load tests
+
+FIELDS = {
+    "posts": ["id", "author", "content", "image_path", "created_at"],
+    "users": ["id", "email", "password_hash"],
+}
+
+WORDS = ("aaj kal kya scene hai yaar chai samosa college exam result party movie cricket match "
+         "weekend trip goa manali photo selfie birthday happy new friends family dinner "
+         "python project tkinter sqlite coding bug fixed finally deadline placement "
+         "monsoon barish garmi winter sunday monday office canteen library hostel mess "
+         "gaana dance music guitar concert fest dosti pyaar life mast bakwas epic").split()
+
+
+def cmd_reindex(args):
+    db_simple.create_tables()
+    db_simple.rebuild_search_index()
+    print("Search index rebuilt.")
+
+
+def _format(path, given):
+    if given:
+        return given
+    return "csv" if path.lower().endswith(".csv") else "jsonl"
+
+
+def _open(path, mode, fmt):
+    if path == "-":
+        return sys.stdout if "w" in mode else sys.stdin
+    return open(path, mode, newline="" if fmt == "csv" else None, encoding="utf-8")
+
+
+def _rows(table):
+    if table == "posts":
+        return db_simple.iter_posts_oldest(db_simple.BULK_BATCH)
+    return db_simple.iter_users(db_simple.BULK_BATCH)
+
+
+def cmd_export(args):
+    fmt = _format(args.file, args.format)
+    fields = FIELDS[args.table]
+    n = 0
+    f = _open(args.file, "w", fmt)
+    try:
+        if fmt == "csv":
+            writer = csv.writer(f)
+            writer.writerow(fields)
+            for row in _rows(args.table):
+                writer.writerow(row)
+                n += 1
+        else:
+            for row in _rows(args.table):
+                f.write(json.dumps(dict(zip(fields, row)), ensure_ascii=False) + "\n")
+                n += 1
+    finally:
+        if f is not sys.stdout:
+            f.close()
+    print(f"Exported {n} {args.table}.", file=sys.stderr)
+
+
+def _read(f, fmt):
+    # one dict per record, never the whole file in memory
+    if fmt == "csv":
+        yield from csv.DictReader(f)
+    else:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def cmd_import(args):
+    db_simple.create_tables()
+    fmt = _format(args.file, args.format)
+    f = _open(args.file, "r", fmt)
+    started = time.perf_counter()
+    try:
+        records = _read(f, fmt)
+        if args.table == "posts":
+            n = db_simple.add_posts_many(records, args.batch)
+        else:
+            n = db_simple.add_users_many(records, args.batch)
+    finally:
+        if f is not sys.stdin:
+            f.close()
+    print(f"Imported {n} {args.table} in {time.perf_counter() - started:.1f}s.")
+
+
+def synthetic_posts(n, authors, seed=0, days=365):
+    # n posts, oldest first, spread evenly over the last `days` days
+    rng = random.Random(seed)
+    start = datetime.now(timezone.utc) - timedelta(days=days)   # UTC, like CURRENT_TIMESTAMP
+    step = timedelta(days=days) / max(n, 1)
+    for i in range(n):
+        text = " ".join(rng.choices(WORDS, k=rng.randint(4, 30)))
+        created = (start + step * i).strftime("%Y-%m-%d %H:%M:%S")
+        yield rng.choice(authors), text.capitalize(), None, created
+
+
+def cmd_generate(args):
+    db_simple.create_tables()
+    started = time.perf_counter()
+    # every synthetic user has the same password; hashed once, not once per user
+    stored = hash_password(args.password)
+    authors = [f"user{i}@example.com" for i in range(args.users)]
+    added = db_simple.add_users_many({"email": a, "password_hash": stored} for a in authors)
+    print(f"{added} users added (password: {args.password!r})")
+
+    posts = synthetic_posts(args.posts, authors, args.seed)
+    done = 0
+    while done < args.posts:
+        chunk = list(islice(posts, args.batch))
+        done += db_simple.add_posts_many(chunk, args.batch)
+        rate = done / (time.perf_counter() - started)
+        print(f"\r{done}/{args.posts} posts ({rate:,.0f}/s)", end="", flush=True)
+    print(f"\nDone in {time.perf_counter() - started:.1f}s.")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TakeBook database tools")
+    parser.add_argument("--db", default=db_simple.DB_NAME, help="database file (default: %(default)s)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    sub.add_parser("reindex", help="backfill / rebuild the full-text search index").set_defaults(func=cmd_reindex)
+
+    for name, func, help_text in (("export", cmd_export, "write posts or users to JSONL / CSV"),
+                                  ("import", cmd_import, "load posts or users from JSONL / CSV")):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("table", choices=sorted(FIELDS))
+        p.add_argument("file", help='.jsonl or .csv path, "-" for stdin/stdout')
+        p.add_argument("--format", choices=["jsonl", "csv"], help="override the format picked from the extension")
+        p.add_argument("--batch", type=int, default=db_simple.BULK_BATCH, help="rows per transaction")
+        p.set_defaults(func=func)
+
+    p = sub.add_parser("generate", help="add synthetic users and posts for load testing")
+    p.add_argument("--posts", type=int, default=100000)
+    p.add_argument("--users", type=int, default=1000)
+    p.add_argument("--password", default="password", help="password of every generated user")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--batch", type=int, default=db_simple.BULK_BATCH, help="rows per transaction")
+    p.set_defaults(func=cmd_generate)
+
+    args = parser.parse_args(argv)
+    db_simple.DB_NAME = args.db
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import os
+import hashlib
+import threading
+from collections import namedtuple
+from PIL import Image, ImageOps
+
+MEDIA_DIR = "media"
+FEED_SIZE = (600, 400)
+FULL_SIZE = (2048, 2048)
+JPEG_QUALITY = 85
+
+# what gets recorded for an ingested image
+MediaInfo = namedtuple("MediaInfo", "hash feed_path full_path width height")
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def has_alpha(img):
+    return img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info)
+
+
+def save_compact(img, base):
+    # jpeg for normal photos, png only when there is transparency; written via temp file + rename
+    if has_alpha(img):
+        out, fmt, opts = base + ".png", "PNG", {"optimize": True}
+    else:
+        img = img.convert("RGB")
+        out, fmt, opts = base + ".jpg", "JPEG", {"quality": JPEG_QUALITY, "optimize": True}
+    tmp = f"{out}.{threading.get_ident()}.tmp"
+    img.save(tmp, fmt, **opts)
+    os.replace(tmp, out)
+    return out
+
+
+def find_file(base):
+    # saved file for a base path, whichever compact format it ended up in
+    for ext in (".jpg", ".png"):
+        if os.path.exists(base + ext):
+            return base + ext
+    return None
+
+
+def is_feed_rendition(path):
+    # feed renditions are already feed-sized, nothing to shrink
+    return os.path.abspath(path).startswith(os.path.abspath(MEDIA_DIR) + os.sep) and \
+        os.path.splitext(path)[0].endswith("_feed")
+
+
+def ingest_image(path):
+    # copy an uploaded image into the content-hashed store as feed + full renditions;
+    # identical uploads share one set of files
+    digest = file_hash(path)
+    folder = os.path.join(MEDIA_DIR, digest[:2])
+    feed_base = os.path.join(folder, digest + "_feed")
+    full_base = os.path.join(folder, digest + "_full")
+
+    feed_path, full_path = find_file(feed_base), find_file(full_base)
+    if feed_path and full_path:
+        # duplicate upload — header read only, no decode
+        with Image.open(full_path) as full:
+            width, height = full.size
+        return MediaInfo(digest, feed_path, full_path, width, height)
+
+    os.makedirs(folder, exist_ok=True)
+    with Image.open(path) as src:
+        img = ImageOps.exif_transpose(src)   # phone photos: rotate pixels, drop the EXIF flag
+        img.thumbnail(FULL_SIZE)
+        width, height = img.size
+        full_path = save_compact(img, full_base)
+        img.thumbnail(FEED_SIZE)
+        feed_path = save_compact(img, feed_base)
+    return MediaInfo(digest, feed_path, full_path, width, height)
@@ -0,0 +1,91 @@
+from collections import deque
+import cv2
+from instrument import span, timed
+
+# face + smile based mood detection, shared by MoodDetectorWindow and headless tools.
+# fast mode: faces are found on a downscaled frame, full detection only every DETECT_EVERY
+# frames, and in between only a small region around each last known face is searched.
+
+DETECT_SCALE = 0.5     # full-frame detection runs at this fraction of the resolution
+DETECT_EVERY = 5       # frames between full detections
+TRACK_MARGIN = 0.35    # search region grows by this fraction of the face size on each side
+MAX_MISSES = 3         # tracked face dropped after this many frames without a hit
+SMOOTH_FRAMES = 7      # mood label = majority vote over this many frames
+MIN_FACE = 100         # px at full resolution, same as the old detector
+
+HAPPY, NEUTRAL = "kush", "BT"
+
+
+class MoodDetector:
+    def __init__(self, fast=True, scale=DETECT_SCALE, detect_every=DETECT_EVERY, smooth=SMOOTH_FRAMES):
+        self.face_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+        self.smile_cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_smile.xml")
+        self.fast = fast
+        self.scale = scale if fast else 1.0
+        self.detect_every = detect_every if fast else 1
+        self.history = deque(maxlen=smooth if fast else 1)
+        self.tracks = []       # [x, y, w, h, misses] in full-res coords
+        self.frame_no = 0
+
+    def reset(self):
+        self.tracks = []
+        self.history.clear()
+        self.frame_no = 0
+
+    def _detect(self, gray, scale, min_face):
+        if scale != 1.0:
+            gray = cv2.resize(gray, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        m = max(int(min_face * scale), 20)
+        with span("cv.face_cascade"):
+            found = self.face_cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(m, m))
+        return [[int(x / scale), int(y / scale), int(w / scale), int(h / scale)] for (x, y, w, h) in found]
+
+    def _track(self, gray):
+        # search only around each last known face
+        H, W = gray.shape[:2]
+        for t in self.tracks:
+            x, y, w, h = t[:4]
+            mx, my = int(w * TRACK_MARGIN), int(h * TRACK_MARGIN)
+            x0, y0 = max(x - mx, 0), max(y - my, 0)
+            x1, y1 = min(x + w + mx, W), min(y + h + my, H)
+            # the region is small already; shrink it so the face is ~MIN_FACE px for the cascade
+            scale = min(1.0, MIN_FACE * 1.2 / max(w, 1))
+            hits = self._detect(gray[y0:y1, x0:x1], scale, min(MIN_FACE, int(w * 0.7)))
+            if hits:
+                hx, hy, hw, hh = max(hits, key=lambda b: b[2] * b[3])
+                t[:] = [x0 + hx, y0 + hy, hw, hh, 0]
+            else:
+                t[4] += 1
+        self.tracks = [t for t in self.tracks if t[4] <= MAX_MISSES]
+
+    @timed("cv.mood")
+    def process(self, frame):
+        # returns (faces, smiles, mood); faces/smiles are (x, y, w, h) in frame coords, mood is smoothed
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.frame_no % self.detect_every == 0 or not self.tracks:
+            self.tracks = [box + [0] for box in self._detect(gray, self.scale, MIN_FACE)]
+        else:
+            self._track(gray)
+        self.frame_no += 1
+
+        faces = [tuple(t[:4]) for t in self.tracks if t[4] == 0]
+        smiles = []
+        for (x, y, w, h) in faces:
+            roi_gray = gray[y:y + h, x:x + w]
+            with span("cv.smile_cascade"):
+                found = self.smile_cascade.detectMultiScale(roi_gray, scaleFactor=1.7, minNeighbors=20)
+            if len(found) > 0:
+                smiles = [(x + sx, y + sy, sw, sh) for (sx, sy, sw, sh) in found]
+                break
+
+        self.history.append(bool(smiles))
+        mood = HAPPY if sum(self.history) * 2 > len(self.history) else NEUTRAL
+        return faces, smiles, mood
+
+
+def draw(frame, faces, smiles, mood):
+    for (x, y, w, h) in faces:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (90, 200, 255), 2)
+    for (x, y, w, h) in smiles:
+        cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 1)
+    cv2.putText(frame, f"Mood: {mood}", (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1.2, (255, 255, 255), 2, cv2.LINE_AA)
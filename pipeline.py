@@ -0,0 +1,251 @@
+import time
+import queue
+import threading
+from contextlib import contextmanager
+import instrument
+
+# small threaded frame pipeline: capture -> inference -> render, with per-stage timing
+
+EMA_ALPHA = 0.1   # smoothing for latency / fps averages
+
+
+class StageStats:
+    # running latency per stage (ms, exponential moving average) + output fps + dropped frames
+    def __init__(self):
+        self.latency = {}
+        self.counts = {}
+        self.dropped = 0
+        self.fps = 0.0
+        self._last_tick = None
+        self._lock = threading.Lock()
+
+    def record(self, stage, ms):
+        with self._lock:
+            prev = self.latency.get(stage)
+            self.latency[stage] = ms if prev is None else prev + EMA_ALPHA * (ms - prev)
+            self.counts[stage] = self.counts.get(stage, 0) + 1
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, (time.perf_counter() - start) * 1000)
+
+    def tick(self):
+        # call once per displayed frame
+        now = time.perf_counter()
+        with self._lock:
+            if self._last_tick is not None:
+                inst = 1.0 / max(now - self._last_tick, 1e-6)
+                self.fps = inst if not self.fps else self.fps + EMA_ALPHA * (inst - self.fps)
+            self._last_tick = now
+
+    def drop(self):
+        with self._lock:
+            self.dropped += 1
+
+    def snapshot(self):
+        with self._lock:
+            return {"fps": round(self.fps, 1), "dropped": self.dropped,
+                    "latency_ms": {k: round(v, 2) for k, v in self.latency.items()},
+                    "frames": dict(self.counts)}
+
+    def summary(self):
+        snap = self.snapshot()
+        parts = [f"{snap['fps']:.0f} fps"] + [f"{k} {v:.1f}ms" for k, v in snap["latency_ms"].items()]
+        return "  ".join(parts)
+
+
+class LatestSlot:
+    # single-item mailbox: put() overwrites, so readers only ever see the newest frame
+    def __init__(self, stats=None):
+        self._item = None
+        self._fresh = False
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = stats
+
+    def put(self, item):
+        with self._cond:
+            if self._fresh and self._stats is not None:
+                self._stats.drop()   # previous frame never got consumed
+            self._item = item
+            self._fresh = True
+            self._cond.notify()
+
+    def get(self, timeout=None):
+        # waits for an item newer than the last one taken; None on timeout / close
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._fresh or self._closed, timeout):
+                return None
+            if not self._fresh:
+                return None
+            self._fresh = False
+            return self._item
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class FramePipeline:
+    # read_frame() -> (ok, frame) runs on the capture thread and always keeps only the latest frame;
+    # infer(frame) -> result runs on the inference thread; results() is consumed by the render stage
+    def __init__(self, read_frame, infer, depth=2):
+        self.read_frame = read_frame
+        self.infer = infer
+        self.stats = StageStats()
+        self.frames = LatestSlot(self.stats)
+        self.out = queue.Queue(maxsize=depth)
+        self.running = False
+        self.error = None
+        self._threads = []
+
+    def start(self):
+        self.running = True
+        self._threads = [threading.Thread(target=self._capture_loop, daemon=True, name="capture"),
+                         threading.Thread(target=self._infer_loop, daemon=True, name="inference")]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def _capture_loop(self):
+        try:
+            while self.running:
+                start = time.perf_counter()
+                ok, frame = self.read_frame()
+                if not ok:
+                    self.error = "capture failed"
+                    break
+                self.stats.record("capture", (time.perf_counter() - start) * 1000)
+                self.frames.put(frame)
+        except Exception as e:
+            self.error = f"capture failed: {e}"
+            instrument.error("pipeline.capture", e)
+        finally:
+            self.running = False
+            self.frames.close()
+
+    def _infer_loop(self):
+        # always ends with the None sentinel, or results() would block forever
+        try:
+            while True:
+                frame = self.frames.get(timeout=0.5)
+                if frame is None:
+                    if not self.running:
+                        break
+                    continue
+                start = time.perf_counter()
+                result = self.infer(frame)
+                self.stats.record("inference", (time.perf_counter() - start) * 1000)
+                self._push(result)
+        except Exception as e:
+            self.error = f"inference failed: {e}"
+            instrument.error("pipeline.inference", e)
+        finally:
+            self.running = False   # capture thread stops too
+            self._push(None)
+
+    def _push(self, item):
+        # bounded queue: if render falls behind, drop the oldest result instead of piling up latency
+        while True:
+            try:
+                self.out.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.out.get_nowait()
+                    self.stats.drop()
+                except queue.Empty:
+                    pass
+
+    def results(self):
+        while True:
+            item = self.out.get()
+            if item is None:
+                return
+            yield item
+
+    def stop(self):
+        self.running = False
+        self.frames.close()
+        for t in self._threads:
+            t.join(timeout=1.0)
+
+
+class FrameWorker:
+    # reads from a VideoCapture-like source and runs process(frame) on a background thread;
+    # the Tk side polls latest() with after(next_delay()) and only has to blit the result
+    def __init__(self, source, process, min_delay=5, max_delay=100):
+        self.source = source
+        self.process = process
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.stats = StageStats()
+        self.result = LatestSlot(self.stats)
+        self.running = False
+        self.error = None         # set when process() raised; the worker has stopped
+        self._interval = None     # ms between finished frames (EMA)
+        self._thread = None
+
+    def start(self):
+        self.running = True
+        self._thread = threading.Thread(target=self._loop, daemon=True, name="frame-worker")
+        self._thread.start()
+        return self
+
+    def _loop(self):
+        last = None
+        backoff = self.min_delay
+        while self.running:
+            ok, frame = self.source.read()
+            if not ok:
+                if not self.source.isOpened():
+                    break
+                # source still open but gave nothing (camera hiccup): wait, longer each time in a row
+                time.sleep(backoff / 1000)
+                backoff = min(backoff * 2, self.max_delay)
+                continue
+            backoff = self.min_delay
+            start = time.perf_counter()
+            try:
+                out = self.process(frame)
+            except Exception as e:
+                # a broken filter would fail on every frame — stop and let the window show why
+                self.error = f"processing failed: {e}"
+                instrument.error("pipeline.process", e)
+                break
+            done = time.perf_counter()
+            self.stats.record("process", (done - start) * 1000)
+            if last is not None:
+                ms = (done - last) * 1000
+                self._interval = ms if self._interval is None else self._interval + EMA_ALPHA * (ms - self._interval)
+            last = done
+            self.result.put(out)
+        self.running = False
+
+    def finished(self):
+        # worker thread has exited: source ended/closed or process() raised (see error)
+        return self._thread is not None and not self._thread.is_alive()
+
+    def latest(self):
+        # newest finished frame, or None if nothing new since the last call (never blocks)
+        out = self.result.get(timeout=0)
+        if out is not None:
+            self.stats.tick()
+        return out
+
+    def next_delay(self):
+        # poll about twice per produced frame: fast filters get smooth video, slow ones don't spin Tk
+        if self._interval is None:
+            return self.min_delay
+        return int(min(max(self._interval / 2, self.min_delay), self.max_delay))
+
+    def stop(self):
+        self.running = False
+        self.result.close()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
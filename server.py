@@ -0,0 +1,295 @@
+import json
+import time
+import asyncio
+import secrets
+import argparse
+from urllib.parse import urlsplit, parse_qs
+from concurrent.futures import ThreadPoolExecutor
+import db_simple
+import instrument
+
+# headless HTTP/JSON API over db_simple, for many clients / load tests (stdlib only).
+#   POST /login   {"email", "password"}         -> {"token"}
+#   POST /posts   {"content"}  + Authorization: Bearer <token>  -> the new post
+#   GET  /feed    ?cursor=&limit=&author=       -> {"posts", "next_cursor"}
+#   GET  /search  ?q=&cursor=&limit=            -> {"posts", "next_cursor"}
+#   GET  /stats                                  -> executor / group commit / feed cache numbers
+# usage: python server.py [--port 8080] [--db takebook.db]
+# SQLite calls run on a bounded thread pool; new posts are group-committed — everything that
+# queues up while one write transaction runs goes into the next one.
+
+DB_WORKERS = db_simple.POOL_SIZE   # one pooled connection per worker
+MAX_PENDING = 256                  # DB jobs queued or running; beyond this requests get 503
+MAX_WRITE_BATCH = 256              # posts per group commit
+MAX_BODY = 64 * 1024
+MAX_LIMIT = 100
+
+REASONS = {200: "OK", 201: "Created", 400: "Bad Request", 401: "Unauthorized", 404: "Not Found",
+           405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error",
+           503: "Service Unavailable"}
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def post_json(row):
+    pid, author, content, image_path, created_at = row[:5]
+    return {"id": pid, "author": author, "content": content, "image_path": image_path, "created_at": created_at}
+
+
+class GroupCommitter:
+    # single writer task: waits for one post, takes everything else already queued (up to
+    # MAX_WRITE_BATCH) and writes the lot in one transaction — batches grow with load, and a
+    # lone post never waits for a timer
+    def __init__(self, api):
+        self.api = api
+        self.queue = asyncio.Queue()
+        self.batches = 0
+        self.posts = 0
+        self.largest = 0
+
+    async def submit(self, author, content):
+        fut = asyncio.get_running_loop().create_future()
+        await self.queue.put(((author, content), fut))
+        return await fut
+
+    async def run(self):
+        while True:
+            batch = [await self.queue.get()]
+            while len(batch) < MAX_WRITE_BATCH and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                rows = await self.api.db(db_simple.add_posts_batch, [post for post, _ in batch])
+            except Exception as e:
+                for _, fut in batch:
+                    if not fut.done():
+                        fut.set_exception(e)
+                continue
+            self.batches += 1
+            self.posts += len(batch)
+            self.largest = max(self.largest, len(batch))
+            for (_, fut), row in zip(batch, rows):
+                if not fut.done():
+                    fut.set_result(row)
+
+    def stats(self):
+        return {"batches": self.batches, "posts": self.posts, "largest_batch": self.largest,
+                "avg_batch": round(self.posts / self.batches, 2) if self.batches else 0}
+
+
+class API:
+    def __init__(self, workers=DB_WORKERS, max_pending=MAX_PENDING):
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="db")
+        self.max_pending = max_pending
+        self.pending = 0
+        self.rejected = 0
+        self.sessions = {}      # token -> email, in memory: a restart logs everyone out
+        self.writer = GroupCommitter(self)
+        self.requests = 0
+        self.started = time.time()
+
+    async def db(self, func, *args):
+        # blocking db_simple call on the worker pool; refuses new work instead of queueing forever
+        if self.pending >= self.max_pending:
+            self.rejected += 1
+            raise HTTPError(503, "server busy")
+        self.pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.pool, func, *args)
+        finally:
+            self.pending -= 1
+
+    def user(self, headers):
+        auth = headers.get("authorization", "")
+        email = self.sessions.get(auth[7:]) if auth.startswith("Bearer ") else None
+        if email is None:
+            raise HTTPError(401, "login required")
+        return email
+
+    # handlers: (method, path) -> coroutine(query, headers, body) -> (status, payload)
+
+    async def login(self, query, headers, body):
+        email, password = body.get("email"), body.get("password")
+        if not isinstance(email, str) or not isinstance(password, str):
+            raise HTTPError(400, "email and password required")
+        if not await self.db(db_simple.verify_user, email, password):
+            raise HTTPError(401, "invalid email or password")
+        token = secrets.token_urlsafe(24)
+        self.sessions[token] = email
+        return 200, {"token": token}
+
+    async def add_post(self, query, headers, body):
+        email = self.user(headers)
+        content = body.get("content")
+        if not isinstance(content, str) or not content.strip():
+            raise HTTPError(400, "content required")
+        row = await self.writer.submit(email, content)
+        return 201, post_json(row)
+
+    async def feed(self, query, headers, body):
+        limit = _limit(query, db_simple.FEED_PAGE_SIZE)
+        rows, cursor = await self.db(db_simple.get_posts_page, limit, _int(query, "cursor", None),
+                                     query.get("author"))
+        return 200, {"posts": [post_json(r) for r in rows], "next_cursor": cursor}
+
+    async def search(self, query, headers, body):
+        q = query.get("q", "")
+        if not q.strip():
+            raise HTTPError(400, "q required")
+        limit = _limit(query, db_simple.SEARCH_PAGE_SIZE)
+        offset = _int(query, "cursor", None)
+        if offset is not None and offset < 0:
+            raise HTTPError(400, "cursor must not be negative")
+        rows, cursor = await self.db(db_simple.search_posts, q, limit, offset)
+        posts = [dict(post_json(r), highlighted=r[5]) for r in rows]
+        return 200, {"posts": posts, "next_cursor": cursor}
+
+    async def stats(self, query, headers, body):
+        return 200, {"uptime_s": round(time.time() - self.started, 1), "requests": self.requests,
+                     "db_pending": self.pending, "db_rejected": self.rejected,
+                     "errors": instrument.registry.error_count,
+                     "group_commit": self.writer.stats(), "feed_cache": db_simple.feed_cache.stats()}
+
+    def routes(self):
+        return {("POST", "/login"): self.login, ("POST", "/posts"): self.add_post,
+                ("GET", "/feed"): self.feed, ("GET", "/search"): self.search, ("GET", "/stats"): self.stats}
+
+
+def _int(query, name, default):
+    value = query.get(name)
+    if value in (None, ""):
+        return default
+    try:
+        return int(value)
+    except ValueError:
+        raise HTTPError(400, f"{name} must be an integer")
+
+
+def _limit(query, default):
+    # page size: 400 below 1, silently capped at MAX_LIMIT
+    limit = _int(query, "limit", default)
+    if limit < 1:
+        raise HTTPError(400, "limit must be at least 1")
+    return min(limit, MAX_LIMIT)
+
+
+async def read_request(reader):
+    # -> (method, target, headers, body) or None when the client closed the connection
+    try:
+        head = await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise HTTPError(413, "headers too large")
+    lines = head.decode("latin-1").split("\r\n")
+    try:
+        method, target, _ = lines[0].split(" ", 2)
+    except ValueError:
+        raise HTTPError(400, "bad request line")
+    headers = {}
+    for line in lines[1:]:
+        if ":" in line:
+            k, v = line.split(":", 1)
+            headers[k.strip().lower()] = v.strip()
+    length = headers.get("content-length") or "0"
+    if not length.isdigit():
+        raise HTTPError(400, "bad Content-Length")
+    length = int(length)
+    if length > MAX_BODY:
+        raise HTTPError(413, "body too large")
+    body = await reader.readexactly(length) if length else b""
+    return method, target, headers, body
+
+
+def encode(status, payload, keep_alive):
+    body = json.dumps(payload).encode()
+    head = (f"HTTP/1.1 {status} {REASONS.get(status, '')}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+    return head.encode() + body
+
+
+async def handle(api, routes, reader, writer):
+    # one task per connection; HTTP/1.1 keep-alive, requests answered in order
+    try:
+        while True:
+            keep_alive = True
+            request = None
+            try:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, raw = request
+                keep_alive = headers.get("connection", "").lower() != "close"
+                api.requests += 1
+                url = urlsplit(target)
+                handler = routes.get((method, url.path))
+                if handler is None:
+                    known = any(path == url.path for _, path in routes)
+                    raise HTTPError(405 if known else 404, "method not allowed" if known else "not found")
+                query = {k: v[0] for k, v in parse_qs(url.query).items()}
+                try:
+                    body = json.loads(raw) if raw else {}
+                except ValueError:
+                    raise HTTPError(400, "invalid JSON")
+                if not isinstance(body, dict):
+                    raise HTTPError(400, "JSON object expected")
+                status, payload = await handler(query, headers, body)
+            except HTTPError as e:
+                status, payload = e.status, {"error": str(e)}
+                if request is None:
+                    keep_alive = False   # failed while reading: rest of the request is still unread
+            except (ConnectionError, asyncio.IncompleteReadError):
+                raise
+            except Exception as e:
+                # SQLite errors and handler bugs: answer this request, keep serving the rest
+                instrument.error("server.handle", e)
+                status, payload = 500, {"error": "internal error"}
+            writer.write(encode(status, payload, keep_alive))
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(host, port, workers=DB_WORKERS, ready=None):
+    db_simple.create_tables()
+    api = API(workers)
+    routes = api.routes()
+    writer_task = asyncio.create_task(api.writer.run())
+    server = await asyncio.start_server(lambda r, w: handle(api, routes, r, w), host, port)
+    addr = server.sockets[0].getsockname()
+    print(f"TakeBook API on http://{addr[0]}:{addr[1]}  (db: {db_simple.DB_NAME})", flush=True)
+    if ready is not None:
+        ready(addr)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        writer_task.cancel()
+        api.pool.shutdown(wait=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="TakeBook HTTP/JSON API")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080, help="0 = any free port")
+    parser.add_argument("--db", default=db_simple.DB_NAME, help="database file (default: %(default)s)")
+    parser.add_argument("--workers", type=int, default=DB_WORKERS, help="threads for SQLite work")
+    args = parser.parse_args(argv)
+    db_simple.DB_NAME = args.db
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
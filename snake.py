@@ -0,0 +1,72 @@
+import numpy as np
+import cv2
+
+# snake body for play_hand_snake, kept in a preallocated int32 buffer.
+# points are appended at the end and the live window [start, end) slides forward; when it hits
+# the end of the buffer the window is copied back to the front (amortised O(1)), so the body is
+# always one contiguous array — vectorised distance checks and a single polylines call per frame.
+
+NECK = 10           # newest points that can't collide with the head (same as the old loop)
+HIT_RADIUS = 10     # px
+INITIAL_CAPACITY = 1024
+
+
+class SnakeBody:
+    def __init__(self, max_len=10, capacity=INITIAL_CAPACITY):
+        self.max_len = max_len
+        self._alloc(max(capacity, max_len))
+        self.start = self.end = 0
+
+    def _alloc(self, capacity):
+        # twice the longest snake, so compaction happens at most once per `capacity` appends
+        self.buf = np.empty((2 * capacity, 2), np.int32)
+        self.scratch = np.empty((2 * capacity, 2), np.int32)
+        self.dist2 = np.empty(2 * capacity, np.int32)
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.end - self.start
+
+    @property
+    def points(self):
+        return self.buf[self.start:self.end]
+
+    @property
+    def head(self):
+        return self.buf[self.end - 1]
+
+    def grow(self, n):
+        self.max_len += n
+        if self.max_len > self.capacity:
+            old = self.points.copy()
+            self._alloc(self.max_len * 2)
+            self.buf[:len(old)] = old
+            self.start, self.end = 0, len(old)
+
+    def append(self, x, y):
+        if self.end == len(self.buf):
+            n = len(self)
+            self.buf[:n] = self.buf[self.start:self.end]
+            self.start, self.end = 0, n
+        self.buf[self.end] = (x, y)
+        self.end += 1
+        if len(self) > self.max_len:
+            self.start = self.end - self.max_len
+
+    def hits_itself(self, radius=HIT_RADIUS):
+        # head vs every segment except the neck, all at once
+        n = len(self) - NECK
+        if n <= 0:
+            return False
+        diff = self.scratch[:n]
+        np.subtract(self.buf[self.start:self.start + n], self.head, out=diff)
+        d2 = np.einsum("ij,ij->i", diff, diff, out=self.dist2[:n])
+        return bool((d2 < radius * radius).any())
+
+    def draw(self, frame, color=(0, 255, 0), thickness=15):
+        if len(self) > 1:
+            cv2.polylines(frame, [self.points.reshape(-1, 1, 2)], False, color, thickness)
+
+    def reset(self, max_len=10):
+        self.max_len = max_len
+        self.start = self.end = 0
@@ -0,0 +1,35 @@
+import os
+import sys
+import shutil
+import sqlite3
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import db_simple
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    # fresh database file per test; the pool and the feed cache watcher are closed afterwards
+    monkeypatch.setattr(db_simple, "DB_NAME", str(tmp_path / "test.db"))
+    yield db_simple.DB_NAME
+    db_simple.close_pool()
+
+
+@pytest.fixture
+def legacy_db(db):
+    # the checked-in database predates user_version: plaintext passwords, posts.author is the email
+    shutil.copy(os.path.join(ROOT, "takebook.db"), db)
+    return db
+
+
+def raw(path, sql, args=()):
+    # query the file directly, outside db_simple's pool and cache
+    conn = sqlite3.connect(path)
+    try:
+        return conn.execute(sql, args).fetchall()
+    finally:
+        conn.close()
@@ -0,0 +1,30 @@
+import db_simple
+from auth import needs_rehash
+from conftest import raw
+
+# login: scrypt hashes, and plaintext rows from the old schema upgraded on first login
+
+
+def test_legacy_plaintext_login_is_rehashed(legacy_db):
+    db_simple.create_tables()
+    email, stored = raw(legacy_db, "SELECT email, password FROM users ORDER BY id")[0]
+    assert needs_rehash(stored)
+
+    assert not db_simple.verify_user(email, stored + "x")
+    assert raw(legacy_db, "SELECT password FROM users WHERE email=?", (email,)) == [(stored,)]
+
+    assert db_simple.verify_user(email, stored)
+    (upgraded,), = raw(legacy_db, "SELECT password FROM users WHERE email=?", (email,))
+    assert upgraded != stored and not needs_rehash(upgraded)
+    # the old plaintext is no longer accepted as the stored value, only as the password
+    assert db_simple.verify_user(email, stored)
+    assert not db_simple.verify_user(email, upgraded)
+
+
+def test_add_user_and_login(db):
+    db_simple.create_tables()
+    assert db_simple.add_user("new@example.com", "s3cret")
+    assert not db_simple.add_user("new@example.com", "other")
+    assert db_simple.verify_user("new@example.com", "s3cret")
+    assert not db_simple.verify_user("new@example.com", "wrong")
+    assert not db_simple.verify_user("nobody@example.com", "s3cret")
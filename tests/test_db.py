@@ -0,0 +1,55 @@
+import pytest
+
+import db_simple
+from conftest import raw
+
+# schema migrations against throwaway copies — never takebook.db itself
+
+
+def test_unversioned_database_upgrades(legacy_db):
+    users = raw(legacy_db, "SELECT id, email, password FROM users ORDER BY id")
+    posts = raw(legacy_db, "SELECT id, author, content, image_path, created_at FROM posts ORDER BY id")
+    assert raw(legacy_db, "PRAGMA user_version") == [(0,)]
+
+    db_simple.create_tables()
+    db_simple.close_pool()
+
+    assert raw(legacy_db, "PRAGMA user_version") == [(db_simple.SCHEMA_VERSION,)]
+    assert raw(legacy_db, "SELECT id, email, password FROM users ORDER BY id") == users
+    assert list(db_simple.iter_posts_oldest()) == posts
+    columns = {row[1] for row in raw(legacy_db, "PRAGMA table_info(posts)")}
+    assert {"author_id", "image_hash", "image_width", "image_height"} <= columns
+    assert "author" not in columns
+    assert raw(legacy_db, "PRAGMA foreign_key_check") == []
+    # search works on the old rows: the FTS index was backfilled and kept across the rebuild
+    word = posts[0][2].split()[0]
+    rows, _ = db_simple.search_posts(word)
+    assert posts[0][0] in [r[0] for r in rows]
+
+
+def test_migrate_is_idempotent(legacy_db):
+    db_simple.create_tables()
+    db_simple.create_tables()
+    assert raw(legacy_db, "PRAGMA user_version") == [(db_simple.SCHEMA_VERSION,)]
+
+
+def test_new_posts_after_upgrade(legacy_db):
+    db_simple.create_tables()
+    row = db_simple.add_post("aryan@gmail.com", "after the upgrade")
+    assert row[1:3] == ("aryan@gmail.com", "after the upgrade")
+    rows, _ = db_simple.get_posts_page(1)
+    assert rows[0] == row
+
+
+@pytest.mark.parametrize("cursor", [None, 1])
+@pytest.mark.parametrize("author", [None, "a@example.com"])
+def test_page_queries_use_an_index(db, cursor, author):
+    # the SQL get_posts_page runs, cursor subquery and author subselect included
+    db_simple.create_tables()
+    sql, args = db_simple._page_sql(cursor, author)
+    with db_simple.get_conn() as conn:
+        plan = " ".join(r[3] for r in conn.execute("EXPLAIN QUERY PLAN " + sql, args + [20]))
+    assert "USING INDEX idx_posts_" in plan
+    assert "TEMP B-TREE" not in plan
+    if cursor is not None or author is not None:
+        assert "SEARCH p USING INDEX" in plan   # a seek, not a scan from the newest post
@@ -0,0 +1,89 @@
+import sys
+import subprocess
+
+import pytest
+
+import db_simple
+from db_simple import FeedCache
+
+# feed page cache: invalidation on local writes and on commits from other processes, LRU bound
+
+
+@pytest.fixture
+def feed(db):
+    db_simple.create_tables()
+    db_simple.add_posts_many(("a@example.com", f"post {i}", None, f"2025-01-01 10:00:{i:02d}")
+                             for i in range(30))
+    db_simple.feed_cache.close()   # nothing cached from earlier tests
+    return db
+
+
+def _stats():
+    return db_simple.feed_cache.stats()
+
+
+def test_repeat_page_is_a_hit(feed):
+    first = db_simple.get_posts_page(10)
+    hits = _stats()["hits"]
+    assert db_simple.get_posts_page(10) == first
+    assert _stats()["hits"] == hits + 1
+
+
+def test_cached_rows_are_copies(feed):
+    rows, _ = db_simple.get_posts_page(10)
+    rows.clear()
+    assert len(db_simple.get_posts_page(10)[0]) == 10
+
+
+def test_local_write_invalidates(feed):
+    db_simple.get_posts_page(10)
+    row = db_simple.add_post("b@example.com", "fresh")
+    misses = _stats()["misses"]
+    rows, _ = db_simple.get_posts_page(10)
+    assert rows[0] == row
+    assert _stats()["misses"] == misses + 1
+
+
+def test_commit_from_another_process_invalidates(feed):
+    db_simple.get_posts_page(10)
+    # plain sqlite3 in a child process: no bump() here, only PRAGMA data_version can notice it
+    code = ("import sqlite3, sys\n"
+            "conn = sqlite3.connect(sys.argv[1])\n"
+            "with conn:\n"
+            "    conn.execute(\"INSERT INTO posts (author_id, content) VALUES (1, 'from outside')\")\n")
+    subprocess.run([sys.executable, "-c", code, feed], check=True)
+    rows, _ = db_simple.get_posts_page(10)
+    assert rows[0][2] == "from outside"
+
+
+def test_lru_eviction(db):
+    cache = FeedCache(size=2)
+    version = cache.version()
+    cache.put("a", version, 1)
+    cache.put("b", version, 2)
+    assert cache.get("a") == 1      # "a" is now the most recent
+    cache.put("c", version, 3)
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == (1, 3)
+    assert cache.stats()["entries"] == 2
+    cache.close()
+
+
+def test_put_after_version_change_is_dropped(db):
+    cache = FeedCache()
+    version = cache.version()
+    cache.bump()                    # a write lands while the query is running
+    assert cache.version() != version
+    cache.put("page", version, ["stale"])
+    assert cache.get("page") is None
+    cache.close()
+
+
+def test_streaming_bypasses_the_cache(feed):
+    hot = db_simple.get_posts_page(10)
+    entries = _stats()["entries"]
+    assert len(list(db_simple.iter_posts(batch=3))) == 30
+    assert _stats()["entries"] == entries
+    hits = _stats()["hits"]
+    assert db_simple.get_posts_page(10) == hot
+    assert _stats()["hits"] == hits + 1
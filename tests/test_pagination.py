@@ -0,0 +1,44 @@
+import pytest
+
+import db_simple
+from conftest import raw
+
+# keyset feed pagination on (created_at, id): order, per-author pages, limits
+
+
+def test_pagination_follows_created_at(db):
+    db_simple.create_tables()
+    db_simple.add_post("now@example.com", "posted today")
+    # imported history gets higher ids than today's post but must sort below it
+    db_simple.add_posts_many((f"user{i % 3}@example.com", f"post {i}", None, f"2025-01-{i % 28 + 1:02d} 10:00:00")
+                             for i in range(95))
+    expected = raw(db, "SELECT p.id FROM posts p ORDER BY p.created_at DESC, p.id DESC")
+
+    seen, cursor = [], None
+    while True:
+        rows, cursor = db_simple.get_posts_page(10, cursor)
+        seen += [r[0] for r in rows]
+        if cursor is None:
+            break
+    assert seen == [r[0] for r in expected]
+    assert seen[0] == 1
+
+
+def test_author_pages(db):
+    db_simple.create_tables()
+    db_simple.add_posts_many(("a@example.com" if i % 2 else "b@example.com", f"post {i}", None,
+                              f"2025-03-01 10:00:{i:02d}") for i in range(30))
+    rows, cursor = db_simple.get_posts_page(10, author="a@example.com")
+    more, end = db_simple.get_posts_page(10, cursor, author="a@example.com")
+    assert {r[1] for r in rows + more} == {"a@example.com"}
+    assert [r[4] for r in rows + more] == sorted((r[4] for r in rows + more), reverse=True)
+    assert len(rows + more) == 15 and end is None
+
+
+@pytest.mark.parametrize("limit", [0, -1])
+def test_page_limit_must_be_positive(db, limit):
+    db_simple.create_tables()
+    with pytest.raises(ValueError):
+        db_simple.get_posts_page(limit)
+    with pytest.raises(ValueError):
+        db_simple.search_posts("chai", limit)
@@ -0,0 +1,126 @@
+import json
+import socket
+import sqlite3
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import db_simple
+import server
+
+# the HTTP API end to end: a real server on a free port, plain sockets as clients
+
+EMAIL, PASSWORD = "tester@example.com", "s3cret"
+
+
+@pytest.fixture
+def port(db):
+    db_simple.create_tables()
+    db_simple.add_user(EMAIL, PASSWORD)
+    loop = asyncio.new_event_loop()
+    started = threading.Event()
+    addr = []
+    task = loop.create_task(server.serve("127.0.0.1", 0, workers=2,
+                                         ready=lambda a: (addr.append(a), started.set())))
+
+    def run():
+        asyncio.set_event_loop(loop)
+        try:
+            loop.run_until_complete(task)
+        except asyncio.CancelledError:
+            pass
+
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    assert started.wait(10)
+    yield addr[0][1]
+    loop.call_soon_threadsafe(task.cancel)
+    thread.join(10)
+    loop.close()
+
+
+def send(port, raw):
+    # one request on its own connection; -> (status, headers, payload)
+    with socket.create_connection(("127.0.0.1", port), timeout=10) as s:
+        s.sendall(raw)
+        data = b""
+        while b"\r\n\r\n" not in data:
+            data += s.recv(65536)
+        head, body = data.split(b"\r\n\r\n", 1)
+        lines = head.decode("latin-1").split("\r\n")
+        headers = {k.lower(): v.strip() for k, v in (line.split(":", 1) for line in lines[1:])}
+        while len(body) < int(headers["content-length"]):
+            body += s.recv(65536)
+    return int(lines[0].split()[1]), headers, json.loads(body)
+
+
+def call(port, method, path, payload=None, token=None):
+    body = json.dumps(payload).encode() if payload is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nConnection: close\r\nContent-Length: {len(body)}\r\n"
+    if token:
+        head += f"Authorization: Bearer {token}\r\n"
+    return send(port, head.encode() + b"\r\n" + body)
+
+
+def login(port):
+    status, _, payload = call(port, "POST", "/login", {"email": EMAIL, "password": PASSWORD})
+    assert status == 200
+    return payload["token"]
+
+
+@pytest.mark.parametrize("query", ["limit=0", "limit=-1", "limit=abc"])
+def test_feed_rejects_bad_limit(port, query):
+    status, _, payload = call(port, "GET", f"/feed?{query}")
+    assert status == 400 and "limit" in payload["error"]
+
+
+def test_limits_are_capped(port):
+    db_simple.add_posts_many((EMAIL, f"post {i}") for i in range(server.MAX_LIMIT + 5))
+    status, _, payload = call(port, "GET", "/feed?limit=100000")
+    assert status == 200 and len(payload["posts"]) == server.MAX_LIMIT
+    status, _, payload = call(port, "GET", "/search?q=post&limit=0")
+    assert status == 400
+
+
+@pytest.mark.parametrize("length", ["abc", "-5"])
+def test_bad_content_length(port, length):
+    status, headers, payload = send(port, f"POST /posts HTTP/1.1\r\nContent-Length: {length}\r\n\r\n".encode())
+    assert status == 400 and payload == {"error": "bad Content-Length"}
+    assert headers["connection"] == "close"
+
+
+def test_post_needs_a_token(port):
+    status, _, _ = call(port, "POST", "/posts", {"content": "hello"})
+    assert status == 401
+    status, _, _ = call(port, "POST", "/posts", {"content": "hello"}, token="not-a-session")
+    assert status == 401
+
+
+def test_group_commit_round_trip(port):
+    token = login(port)
+    with ThreadPoolExecutor(8) as pool:
+        results = list(pool.map(lambda i: call(port, "POST", "/posts", {"content": f"burst {i}"}, token),
+                                range(16)))
+    assert {status for status, _, _ in results} == {201}
+    posts = [payload for _, _, payload in results]
+    assert [p["content"] for p in posts] == [f"burst {i}" for i in range(16)]
+    assert len({p["id"] for p in posts}) == 16 and {p["author"] for p in posts} == {EMAIL}
+
+    _, _, feed = call(port, "GET", "/feed?limit=16")
+    assert {p["id"] for p in feed["posts"]} == {p["id"] for p in posts}
+    _, _, stats = call(port, "GET", "/stats")
+    assert stats["group_commit"]["posts"] == 16
+    assert stats["group_commit"]["batches"] <= 16
+
+
+def test_handler_error_is_a_500(port, monkeypatch):
+    def locked(*args):
+        raise sqlite3.OperationalError("database is locked")
+    monkeypatch.setattr(db_simple, "get_posts_page", locked)
+    status, _, payload = call(port, "GET", "/feed")
+    assert status == 500 and payload == {"error": "internal error"}
+    # the server keeps answering
+    status, _, _ = call(port, "GET", "/stats")
+    assert status == 200
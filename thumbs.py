@@ -0,0 +1,156 @@
+import os
+import hashlib
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from collections import OrderedDict
+from PIL import Image, ImageTk
+from media import save_compact, find_file, is_feed_rendition
+import instrument
+from instrument import timed
+
+THUMB_DIR = ".thumbcache"
+THUMB_SIZE = (600, 400)
+PHOTO_BUDGET = 48 * 1024 * 1024   # decoded pixel bytes kept alive as PhotoImage objects
+DECODE_WORKERS = 2
+POLL_MS = 30
+
+
+def thumb_key(path):
+    # content-addressed by source path + mtime + size, so an edited file gets a fresh thumbnail
+    st = os.stat(path)
+    raw = f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}"
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def make_thumbnail(path):
+    # decode the original once and store a feed-sized copy; returns the thumbnail file path
+    if is_feed_rendition(path):
+        return path
+    key = thumb_key(path)
+    cached = find_file(os.path.join(THUMB_DIR, key[:2], key))
+    if cached:
+        return cached
+    img = Image.open(path)
+    img.thumbnail(THUMB_SIZE)
+    folder = os.path.join(THUMB_DIR, key[:2])
+    os.makedirs(folder, exist_ok=True)
+    return save_compact(img, os.path.join(folder, key))
+
+
+@timed("image.decode")
+def load_thumbnail(path):
+    # small decoded thumbnail for a source image (generated on the fly if missing)
+    img = Image.open(make_thumbnail(path))
+    img.load()
+    return img
+
+
+class PhotoCache:
+    # LRU of ready PhotoImage objects, bounded by decoded pixel bytes; use from the Tk thread only
+    def __init__(self, budget=PHOTO_BUDGET):
+        self.budget = budget
+        self.used = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()   # key -> (photo, nbytes)
+
+    def get(self, key):
+        item = self._items.get(key)
+        if item is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._items.move_to_end(key)
+        return item[0]
+
+    def put(self, key, photo):
+        nbytes = photo.width() * photo.height() * 4
+        old = self._items.pop(key, None)
+        if old is not None:
+            self.used -= old[1]
+        self._items[key] = (photo, nbytes)
+        self.used += nbytes
+        # purane photos nikaalo jab tak budget mein na aa jaye (latest wala hamesha rehta hai)
+        while self.used > self.budget and len(self._items) > 1:
+            _, (_, n) = self._items.popitem(last=False)
+            self.used -= n
+
+    def clear(self):
+        # PhotoImages belong to one Tk root; call this before that root goes away
+        self._items.clear()
+        self.used = 0
+
+
+photo_cache = PhotoCache()
+
+
+class ImageLoader:
+    # decodes thumbnails on worker threads; finished images come back to Tk through a queue
+    # drained with after(), because PhotoImage must be built on the Tk thread
+    def __init__(self, widget, workers=DECODE_WORKERS):
+        self.widget = widget
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="thumb")
+        self.done = queue.SimpleQueue()
+        self.pending = {}        # token -> Future
+        self._poll_id = None
+
+    def request(self, path, callback):
+        # callback(photo) runs on the Tk thread (photo None if the image failed);
+        # returns a token for cancel(), or None if the photo was already cached
+        try:
+            key = thumb_key(path)
+        except OSError as e:
+            instrument.error("thumbs.request", e)
+            callback(None)
+            return None
+        photo = photo_cache.get(key)
+        if photo is not None:
+            callback(photo)
+            return None
+        token = object()
+        self.pending[token] = self.pool.submit(self._decode, token, key, path, callback)
+        if self._poll_id is None:
+            self._poll_id = self.widget.after(POLL_MS, self._poll)
+        return token
+
+    def _decode(self, token, key, path, callback):
+        # worker thread — no Tk calls here
+        try:
+            self.done.put((token, key, load_thumbnail(path), callback, None))
+        except Exception as e:
+            self.done.put((token, key, None, callback, e))
+
+    def cancel(self, token):
+        # card scrolled away — drop the job (a running decode finishes but its result is ignored)
+        fut = self.pending.pop(token, None)
+        if fut is not None:
+            fut.cancel()
+
+    def _poll(self):
+        self._poll_id = None
+        while True:
+            try:
+                token, key, img, callback, err = self.done.get_nowait()
+            except queue.Empty:
+                break
+            if self.pending.pop(token, None) is None:
+                continue   # cancelled
+            if err is not None:
+                instrument.error("thumbs.decode", err)
+                callback(None)
+                continue
+            with instrument.span("image.photo"):
+                photo = ImageTk.PhotoImage(img)
+            photo_cache.put(key, photo)
+            callback(photo)
+        if self.pending:
+            self._poll_id = self.widget.after(POLL_MS, self._poll)
+
+    def close(self):
+        for fut in self.pending.values():
+            fut.cancel()
+        self.pending.clear()
+        if self._poll_id is not None:
+            self.widget.after_cancel(self._poll_id)
+            self._poll_id = None
+        self.pool.shutdown(wait=False, cancel_futures=True)
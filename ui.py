@@ -1,9 +1,13 @@
 import tkinter as tk
 from tkinter import messagebox, filedialog, ttk
-from PIL import Image, ImageTk
 import threading
-from db_simple import add_user, verify_user, add_post, get_posts
-from cv import play_hand_snake, VideoFilterWindow, MoodDetectorWindow
+from utils import run_in_background
+from db_simple import add_user, verify_user, add_post, get_posts_page, search_posts
+from feed import VirtualFeed
+from thumbs import photo_cache
+from media import ingest_image
+import instrument
+from diagnostics import DiagnosticsPanel
 
 # rang/theme — app ka look and feel
 BG_COLOR = "#f0f2f5"
@@ -13,6 +17,22 @@ SEPARATOR_COLOR = "#dadde1"
 FONT_FAMILY = "Helvetica"
 FONT_BOLD = "Helvetica Bold"
 GREY_TEXT = "#65676b"
+SEARCH_DELAY_MS = 300   # typing rukne ke baad itna wait, fir search
+CV_WARMUP = True        # login ke baad background mein OpenCV/MediaPipe load kar lo
+
+
+def load_cv():
+    # cv.py pulls in OpenCV, MediaPipe and numpy — imported on first use, not at startup
+    import cv
+    return cv
+
+
+def warm_up_cv():
+    # background thread after login, so Khelo Kudo opens without the import pause
+    try:
+        load_cv().warm_up()
+    except Exception as e:
+        instrument.error("cv.warm_up", e)
 
 
 # ek chota helper widget — entry with placeholder text
@@ -76,6 +96,12 @@ class PlaceholderText(tk.Text):
         val = self.get("1.0", "end-1c").strip()
         return "" if val == self.placeholder else val
 
+    def clear(self):
+        # post ho gaya — box ko wapas placeholder pe le aao
+        self.delete("1.0", tk.END)
+        self.insert("1.0", self.placeholder)
+        self.config(fg="grey")
+
 
 # Signup window
 class RegistrationWindow(tk.Toplevel):
@@ -97,8 +123,9 @@ class RegistrationWindow(tk.Toplevel):
         self.confirm = PlaceholderEntry(self, "Confirm password", is_password=True)
         self.confirm.pack(pady=8, ipady=6, fill="x", padx=30)
 
-        tk.Button(self, text="Sign Up", bg="#42b72a", fg="white", font=(FONT_BOLD, 13),
-                  relief="flat", cursor="hand2", command=self.signup).pack(pady=20, ipadx=10, ipady=5)
+        self.signup_btn = tk.Button(self, text="Sign Up", bg="#42b72a", fg="white", font=(FONT_BOLD, 13),
+                                    relief="flat", cursor="hand2", command=self.signup)
+        self.signup_btn.pack(pady=20, ipadx=10, ipady=5)
 
     def signup(self):
         # validate, fir DB mein insert karo
@@ -113,7 +140,15 @@ class RegistrationWindow(tk.Toplevel):
             messagebox.showerror("Error", "Passwords do not match.")
             return
         # db_simple.add_user — returns False agar email pehle se hai
-        if add_user(email, pw):
+        # password hashing slow hai, isliye background thread pe
+        self.signup_btn.config(state="disabled", text="Creating...")
+        run_in_background(self, add_user, (email, pw), self._signup_done)
+
+    def _signup_done(self, created, error):
+        self.signup_btn.config(state="normal", text="Sign Up")
+        if error is not None:
+            messagebox.showerror("Error", f"Could not create account: {error}")
+        elif created:
             messagebox.showinfo("Success", "Account created successfully!")
             self.destroy()
         else:
@@ -138,8 +173,9 @@ class FacebookLogin:
         self.password = PlaceholderEntry(frame, "Password", is_password=True, width=30)
         self.password.pack(pady=5, ipady=6)
 
-        tk.Button(frame, text="Log In", bg=PRIMARY_COLOR, fg="white", width=30, font=(FONT_BOLD, 12),
-                  relief="flat", command=self.login).pack(pady=10, ipady=8)
+        self.login_btn = tk.Button(frame, text="Log In", bg=PRIMARY_COLOR, fg="white", width=30, font=(FONT_BOLD, 12),
+                                   relief="flat", command=self.login)
+        self.login_btn.pack(pady=10, ipady=8)
         tk.Frame(frame, height=1, bg=SEPARATOR_COLOR).pack(fill="x", padx=30, pady=15)
         tk.Button(frame, text="Create New Account", bg="#42b72a", fg="white", font=(FONT_BOLD, 11),
                   relief="flat", command=self.open_signup).pack(pady=5, ipady=8)
@@ -155,13 +191,28 @@ class FacebookLogin:
         if not email or not pw:
             messagebox.showwarning("Error", "Please enter both fields.")
             return
-        if verify_user(email, pw):
+        # hash check is deliberately slow — run it off the Tk thread so the window stays responsive
+        self.login_btn.config(state="disabled", text="Logging in...")
+        run_in_background(self.root, verify_user, (email, pw), lambda ok, err: self._login_done(email, ok, err))
+
+    def _login_done(self, email, ok, error):
+        if ok:
             self.root.destroy()
             FacebookHome(email)
+            return
+        self.login_btn.config(state="normal", text="Log In")
+        if error is not None:
+            messagebox.showerror("Error", f"Login failed: {error}")
         else:
             messagebox.showerror("Error", "Invalid email or password.")
 
 
+def save_post(email, content, img_path=None):
+    # worker thread: image ko media store mein copy karo (feed sirf chhoti rendition padhega), then insert
+    media = ingest_image(img_path) if img_path else None
+    return add_post(email, content, media=media)
+
+
 # Main app window — feed + khelo kudo etc.
 class FacebookHome:
     def __init__(self, email):
@@ -171,6 +222,9 @@ class FacebookHome:
         self.root.geometry("950x600")
         self.root.config(bg=BG_COLOR)
         self.active_tab = None
+        self.feed = None
+        self.search_query = ""
+        self._search_after = None
 
         # build layout
         self.create_top_bar()
@@ -178,6 +232,8 @@ class FacebookHome:
         self.create_feed()
         # default view
         self.show_home()
+        if CV_WARMUP:
+            threading.Thread(target=warm_up_cv, daemon=True).start()
         self.root.mainloop()
 
     def create_top_bar(self):
@@ -188,10 +244,16 @@ class FacebookHome:
         logo = tk.Label(bar, text="takebook", font=(FONT_BOLD, 24), fg=PRIMARY_COLOR, bg=WHITE_COLOR)
         logo.pack(side="left", padx=25)
 
+        # search-as-you-type, debounced so every keystroke doesn't hit the DB
+        self.search_box = PlaceholderEntry(bar, "🔍 Search TakeBook", width=24)
+        self.search_box.pack(side="left", ipady=4)
+        self.search_box.bind("<KeyRelease>", self.on_search_key)
+
         nav_frame = tk.Frame(bar, bg=WHITE_COLOR)
         nav_frame.pack(side="right", padx=25)
 
-        menu_items = {"Home": self.show_home, "About": self.show_about, "Khelo Kudo 🎮": self.show_khelo, "Account": self.show_account}
+        menu_items = {"Home": self.show_home, "About": self.show_about, "Khelo Kudo 🎮": self.show_khelo,
+                      "Diagnostics": self.show_diagnostics, "Account": self.show_account}
         self.buttons = {}
         for name, func in menu_items.items():
             # labels act as clickable nav items — simple, no extra widgets needed
@@ -232,11 +294,35 @@ class FacebookHome:
     def show_home(self):
         tk.Label(self.feed_frame, text="Home Feed", font=(FONT_BOLD, 16), bg=BG_COLOR).pack(pady=10)
         self.create_post_box()
-        posts = get_posts()
-        if not posts:
-            tk.Label(self.feed_frame, text="No posts yet.", bg=BG_COLOR, fg=GREY_TEXT).pack(pady=30)
-        for author, content, img, time in posts:
-            self.display_post(author, content, img, time)
+        # virtual feed — sirf visible cards banenge, pages scroll pe fetch honge
+        self.feed = VirtualFeed(self.feed_frame, self.feed_page,
+                                empty_text="No matching posts." if self.search_query else "No posts yet.")
+        self.feed.pack(fill="both", expand=True)
+
+    def feed_page(self, cursor):
+        # home feed, or search results while something is typed in the search box
+        if not self.search_query:
+            return get_posts_page(cursor=cursor)
+        rows, cursor = search_posts(self.search_query, cursor=cursor)
+        # highlighted text replaces content on the card
+        return [(pid, author, marked, img, time) for pid, author, _, img, time, marked, _ in rows], cursor
+
+    def on_search_key(self, _):
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(SEARCH_DELAY_MS, self.run_search)
+
+    def run_search(self):
+        self._search_after = None
+        query = self.search_box.get_value().strip()
+        if query == self.search_query:
+            return
+        self.search_query = query
+        if self.feed is not None and self.feed.winfo_exists():
+            self.feed.empty_text = "No matching posts." if query else "No posts yet."
+            self.feed.reset()
+        else:
+            self.switch_tab(self.show_home, "Home")
 
     def create_post_box(self):
         # small white card to write a post
@@ -244,8 +330,9 @@ class FacebookHome:
         f.pack(pady=10, padx=10, fill="x")
         text = PlaceholderText(f, f"What's on your mind, {self.email.split('@')[0]}?", height=3)
         text.pack(pady=10, padx=15, fill="x")
-        tk.Button(f, text="Post", bg=PRIMARY_COLOR, fg="white", font=(FONT_BOLD, 11),
-                  command=lambda: self.submit_post(text)).pack(pady=(5, 10))
+        self.post_btn = tk.Button(f, text="Post", bg=PRIMARY_COLOR, fg="white", font=(FONT_BOLD, 11),
+                                  command=lambda: self.submit_post(text))
+        self.post_btn.pack(pady=(5, 10))
 
     def submit_post(self, text_box):
         # save post to DB, optional image
@@ -256,41 +343,48 @@ class FacebookHome:
         img_path = None
         if messagebox.askyesno("Add Image", "Do you want to attach an image?"):
             img_path = filedialog.askopenfilename(filetypes=[("Image Files", "*.png;*.jpg;*.jpeg")])
-        add_post(self.email, content, img_path)
-        # refresh feed; switch_tab keeps nav highlight consistent
-        self.switch_tab(self.show_home, "Home")
-
-    def display_post(self, author, content, image, created):
-        # render one post card — author, time, text, optional image
-        post = tk.Frame(self.feed_frame, bg=WHITE_COLOR, highlightbackground=SEPARATOR_COLOR, highlightthickness=1)
-        post.pack(pady=8, padx=10, fill="x")
-        tk.Label(post, text=author, font=(FONT_BOLD, 12), bg=WHITE_COLOR).pack(anchor="w", padx=15, pady=(8, 0))
-        tk.Label(post, text=created.split('.')[0], fg=GREY_TEXT, font=("Arial", 9), bg=WHITE_COLOR).pack(anchor="w", padx=15)
-        tk.Label(post, text=content, bg=WHITE_COLOR, font=("Arial", 12), wraplength=600, justify="left").pack(anchor="w", padx=15, pady=(5, 10))
-        if image:
-            try:
-                img = Image.open(image)
-                img.thumbnail((600, 400))
-                photo = ImageTk.PhotoImage(img)
-                lbl = tk.Label(post, image=photo, bg=WHITE_COLOR)
-                lbl.image = photo
-                lbl.pack(padx=15, pady=5)
-            except Exception as e:
-                # agar image load nahi hua toh console pe print kar denge
-                print("Error loading image:", e)
+        # image decode + resize + DB write off the Tk thread; button stays disabled till it's done
+        self.post_btn.config(state="disabled", text="Posting...")
+        run_in_background(self.root, save_post, (self.email, content, img_path),
+                          lambda row, err: self._post_done(text_box, row, err))
+
+    def _post_done(self, text_box, row, error):
+        if self.post_btn.winfo_exists():
+            self.post_btn.config(state="normal", text="Post")
+        if error is not None:
+            messagebox.showerror("Error", f"Could not save post: {error}")
+            return
+        if self.feed is not None and self.feed.winfo_exists():
+            if self.search_query:
+                # results are rank-ordered and may not even match the new post — re-run the search
+                self.feed.reset()
+            else:
+                # sirf naya card upar add karo — baaki feed waisa hi rehta hai
+                self.feed.prepend(row)
+        if text_box.winfo_exists():
+            text_box.clear()
 
     # Khelo Kudo: games and camera fun
     def show_khelo(self):
         tk.Label(self.feed_frame, text="🎮 Khelo Kudo Zone", font=(FONT_BOLD, 18), bg=BG_COLOR).pack(pady=20)
         # snake game runs in a separate daemon thread so UI doesn't freeze
         tk.Button(self.feed_frame, text="Play Snake 🐍", bg=PRIMARY_COLOR, fg="white", font=(FONT_BOLD, 12),
-                  command=lambda: threading.Thread(target=play_hand_snake, daemon=True).start()).pack(pady=12, ipadx=10, ipady=5)
+                  command=self.play_snake).pack(pady=12, ipadx=10, ipady=5)
         # filters open in a Toplevel window
         tk.Button(self.feed_frame, text="Live Filters 🎥", bg="#2ecc71", fg="white", font=(FONT_BOLD, 12),
-                  command=lambda: VideoFilterWindow(self.root)).pack(pady=12, ipadx=10, ipady=5)
+                  command=lambda: load_cv().VideoFilterWindow(self.root)).pack(pady=12, ipadx=10, ipady=5)
         # mood detector also in Toplevel — quick demo (smile => Happy)
         tk.Button(self.feed_frame, text="Mood Detector 😊", bg="#ffb74d", fg="black", font=(FONT_BOLD, 12),
-                  command=lambda: MoodDetectorWindow(self.root)).pack(pady=12, ipadx=10, ipady=5)
+                  command=lambda: load_cv().MoodDetectorWindow(self.root)).pack(pady=12, ipadx=10, ipady=5)
+
+    def play_snake(self):
+        # game loop owns its OpenCV window on a worker thread; errors come back to the Tk thread
+        run_in_background(self.root, load_cv().play_hand_snake, on_done=self._snake_done, poll_ms=200)
+
+    def _snake_done(self, result, error):
+        if error is not None:
+            instrument.error("cv.snake", error)
+            messagebox.showerror("Snake Game", str(error))
 
     # About page — short description
     def show_about(self):
@@ -298,6 +392,11 @@ class FacebookHome:
         tk.Label(self.feed_frame, text="This is a Python-based Facebook clone built using Tkinter and SQLite.",
                  font=(FONT_FAMILY, 12), bg=BG_COLOR).pack(pady=10)
 
+    # Diagnostics — timings / counters from instrument.py, exportable as JSON
+    def show_diagnostics(self):
+        tk.Label(self.feed_frame, text="Diagnostics", font=(FONT_BOLD, 16), bg=BG_COLOR).pack(pady=10)
+        DiagnosticsPanel(self.feed_frame).pack(fill="both", expand=True)
+
     # Account page — show email and logout
     def show_account(self):
         tk.Label(self.feed_frame, text="Account", font=(FONT_BOLD, 18), bg=BG_COLOR).pack(pady=30)
@@ -307,6 +406,7 @@ class FacebookHome:
 
     def logout(self):
         # close current window and return to login
+        photo_cache.clear()
         self.root.destroy()
         r = tk.Tk()
         FacebookLogin(r)
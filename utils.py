@@ -1,5 +1,7 @@
 
 import tkinter as tk
+import threading
+import queue
 
 BG_COLOR = "#f0f2f5"
 WHITE_COLOR = "#ffffff"
@@ -7,6 +9,7 @@ PRIMARY_COLOR = "#1877f2"
 SEPARATOR_COLOR = "#dadde1"
 FONT_FAMILY = "Helvetica"
 FONT_BOLD = "Helvetica Bold"
+GREY_TEXT = "#65676b"
 
 class PlaceholderEntry(tk.Entry):
     def __init__(self, parent, placeholder, is_password=False, **kwargs):
@@ -35,3 +38,26 @@ class PlaceholderEntry(tk.Entry):
     def get_value(self):
         val = self.get()
         return "" if val == self.placeholder else val
+
+
+def run_in_background(widget, func, args=(), on_done=None, poll_ms=20):
+    # run func(*args) on a worker thread; on_done(result, error) is called back on the Tk thread
+    results = queue.SimpleQueue()
+
+    def work():
+        try:
+            results.put((func(*args), None))
+        except Exception as e:
+            results.put((None, e))
+
+    def poll():
+        try:
+            result, error = results.get_nowait()
+        except queue.Empty:
+            widget.after(poll_ms, poll)
+            return
+        if on_done is not None:
+            on_done(result, error)
+
+    threading.Thread(target=work, daemon=True).start()
+    widget.after(poll_ms, poll)